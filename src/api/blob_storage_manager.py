@@ -4,16 +4,23 @@
 
 """Blob storage manager for document uploads."""
 
+import asyncio
+import hashlib
 import logging
+import mimetypes
 import re
-from typing import Optional
+import time
+from typing import AsyncIterator, BinaryIO, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 
+import aiohttp
 from azure.core.credentials_async import AsyncTokenCredential
-from azure.storage.blob.aio import BlobServiceClient, ContainerClient
-from azure.storage.blob import BlobSasPermissions, generate_blob_sas
-from azure.core.exceptions import ResourceExistsError
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.storage.blob.aio import BlobServiceClient
+from azure.storage.blob import BlobSasPermissions, BlobType, ContentSettings, UserDelegationKey, generate_blob_sas
+from azure.core.exceptions import HttpResponseError, ResourceExistsError, ResourceNotFoundError
 
+from .credentials import get_shared_credential
 from .util import get_logger
 
 logger = get_logger(
@@ -26,26 +33,69 @@ logger = get_logger(
 class BlobStorageManager:
     """
     Manages document uploads to Azure Blob Storage.
+
+    One instance is meant to live for the whole application lifetime (it is
+    created in the app lifespan and stored in ``app.state``) so that the
+    connection pool of the underlying client is reused across requests.
+    Call :meth:`close` only on shutdown.
     
     :param blob_endpoint: Azure Storage Blob endpoint
-    :param credential: Azure credential for authentication
+    :param credential: Azure credential for authentication (default: the process-wide shared credential)
     :param container_name: Name of the blob container (default: 'documents')
+    :param storage_account_name: Name of the storage account, used for SAS generation
+    :param max_concurrent_uploads: Maximum number of uploads running at the same time (default: 16)
+    :param upload_max_concurrency: Number of parallel block uploads for a single large blob (default: 8)
+    :param max_block_size: Block size in bytes used when a blob is uploaded in chunks (default: 8 MiB)
+    :param list_cache_ttl: Seconds for which the result of list_documents is cached (default: 30)
     """
+
+    # Maximum number of sub-requests accepted by a single blob batch request
+    BATCH_DELETE_SIZE = 256
+    # Lifetime of a requested user delegation key (the service allows up to 7 days)
+    DELEGATION_KEY_LIFETIME = timedelta(days=2)
     
     def __init__(
         self,
         blob_endpoint: str,
-        credential: AsyncTokenCredential,
+        credential: Optional[AsyncTokenCredential] = None,
         container_name: str = 'documents',
-        storage_account_name: Optional[str] = None
+        storage_account_name: Optional[str] = None,
+        max_concurrent_uploads: int = 16,
+        upload_max_concurrency: int = 8,
+        max_block_size: int = 8 * 1024 * 1024,
+        list_cache_ttl: float = 30.0
     ) -> None:
-        """Initialize blob storage manager."""
+        """Initialize blob storage manager. Must be called from within a running event loop."""
         self._blob_endpoint = blob_endpoint
-        self._credential = credential
+        self._credential = credential or get_shared_credential()
         self._container_name = container_name
         self._storage_account_name = storage_account_name
-        self._blob_service_client: Optional[BlobServiceClient] = None
-        self._container_client: Optional[ContainerClient] = None
+        self._upload_semaphore = asyncio.Semaphore(max_concurrent_uploads)
+        self._upload_max_concurrency = upload_max_concurrency
+        self._delegation_key: Optional[UserDelegationKey] = None
+        self._delegation_key_expiry: Optional[datetime] = None
+        self._delegation_key_lock = asyncio.Lock()
+        self._list_cache: Optional[Tuple[float, List[dict]]] = None
+        self._list_cache_ttl = list_cache_ttl
+        self._list_cache_lock = asyncio.Lock()
+        # Size the connection pool so that concurrent uploads do not wait for a free socket.
+        # The remaining session settings match the ones the SDK uses for its own sessions.
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_concurrent_uploads * 2),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            auto_decompress=False,
+            trust_env=True
+        )
+        # Creating the clients does not touch the network
+        self._blob_service_client = BlobServiceClient(
+            account_url=self._blob_endpoint,
+            credential=self._credential,
+            transport=AioHttpTransport(session=session, session_owner=True),
+            max_block_size=max_block_size
+        )
+        self._container_client = self._blob_service_client.get_container_client(
+            self._container_name
+        )
 
     @staticmethod
     def _sanitize_filename(filename: str) -> str:
@@ -75,31 +125,47 @@ class BlobStorageManager:
 
         return result
     
-    async def _get_blob_service_client(self) -> BlobServiceClient:
-        """Get or create blob service client."""
-        if self._blob_service_client is None:
-            self._blob_service_client = BlobServiceClient(
-                account_url=self._blob_endpoint,
-                credential=self._credential
-            )
-        return self._blob_service_client
-    
-    async def _get_container_client(self) -> ContainerClient:
-        """Get or create container client."""
-        if self._container_client is None:
-            blob_service_client = await self._get_blob_service_client()
-            self._container_client = blob_service_client.get_container_client(
-                self._container_name
-            )
-        return self._container_client
-    
+    @staticmethod
+    def _hash_stream(stream: BinaryIO) -> Tuple[str, int]:
+        """
+        Hash a binary stream in chunks and rewind it.
+
+        :param stream: Seekable binary stream positioned at its start
+        :return: Tuple of (hex content hash, length in bytes)
+        """
+        content_hash = hashlib.blake2b(digest_size=16)
+        length = 0
+        while chunk := stream.read(1024 * 1024):
+            content_hash.update(chunk)
+            length += len(chunk)
+        stream.seek(0)
+        return content_hash.hexdigest(), length
+
+    @staticmethod
+    def _original_filename(blob_name: str) -> str:
+        """
+        Extract the original filename from a blob name.
+
+        Supports the content hash prefix (``<32 hex chars>_name.pdf``) and the
+        legacy timestamp prefix (``20251112_103403_name.pdf``).
+
+        :param blob_name: Name of the blob
+        :return: Filename without prefix
+        """
+        prefix, _, rest = blob_name.partition('_')
+        if rest and len(prefix) == 32 and all(c in '0123456789abcdef' for c in prefix):
+            return rest
+        parts = blob_name.split('_', 2)
+        if len(parts) >= 3:
+            return parts[2]
+        return blob_name
+
     async def ensure_container_exists(self) -> None:
         """
         Ensure the blob container exists, create if not.
         """
         try:
-            container_client = await self._get_container_client()
-            await container_client.create_container()
+            await self._container_client.create_container()
             logger.info(f"Created blob container: {self._container_name}")
         except ResourceExistsError:
             logger.info(f"Blob container already exists: {self._container_name}")
@@ -110,40 +176,64 @@ class BlobStorageManager:
     async def upload_document(
         self,
         filename: str,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         metadata: Optional[dict] = None
-    ) -> str:
+    ) -> Tuple[str, bool]:
         """
         Upload document to blob storage.
 
+        A binary stream is uploaded in blocks without reading it into memory.
+
         :param filename: Name of the file
-        :param file_content: Binary content of the file
+        :param file_content: Binary content of the file or a seekable binary stream
         :param metadata: Optional metadata to attach to the blob
-        :return: Blob URL
+        :return: Tuple of (blob URL, True if this call created the blob or False if an identical blob was stored)
         """
         try:
             # Sanitize filename to avoid issues with SAS token generation
             # The blob name must be ASCII-compatible to avoid signature mismatches
             sanitized_filename = self._sanitize_filename(filename)
 
-            # Generate unique blob name with timestamp
-            timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            blob_name = f"{timestamp}_{sanitized_filename}"
+            # Name the blob after its content so concurrent uploads of the same
+            # filename cannot overwrite each other and re-uploads are idempotent
+            if isinstance(file_content, bytes):
+                content_hash = hashlib.blake2b(file_content, digest_size=16).hexdigest()
+                length = len(file_content)
+            else:
+                content_hash, length = await asyncio.to_thread(self._hash_stream, file_content)
+            blob_name = f"{content_hash}_{sanitized_filename}"
+            metadata = {**(metadata or {}), 'content_hash': content_hash}
 
-            container_client = await self._get_container_client()
-            blob_client = container_client.get_blob_client(blob_name)
+            blob_client = self._container_client.get_blob_client(blob_name)
 
-            # Upload blob
-            await blob_client.upload_blob(
-                file_content,
-                overwrite=True,
-                metadata=metadata or {}
-            )
+            # Skip the upload if an identical blob is already stored
+            try:
+                properties = await blob_client.get_blob_properties()
+                if properties.metadata.get('content_hash') == content_hash:
+                    logger.info(f"Document already in blob storage, skipping upload: {blob_name}")
+                    return blob_client.url, False
+            except ResourceNotFoundError:
+                pass
+
+            # Upload blob, limiting the number of uploads in flight
+            async with self._upload_semaphore:
+                await blob_client.upload_blob(
+                    file_content,
+                    length=length,
+                    blob_type=BlobType.BLOCKBLOB,
+                    overwrite=True,
+                    metadata=metadata,
+                    content_settings=ContentSettings(
+                        content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                    ),
+                    max_concurrency=self._upload_max_concurrency
+                )
 
+            self._list_cache = None
             blob_url = blob_client.url
             logger.info(f"Uploaded document to blob storage: {blob_name}")
 
-            return blob_url
+            return blob_url, True
         except Exception as e:
             logger.error(f"Error uploading document to blob storage: {e}")
             raise
@@ -153,37 +243,127 @@ class BlobStorageManager:
         Delete document from blob storage.
         
         :param blob_name: Name of the blob to delete
+        :raises HttpResponseError: If the blob could not be deleted
         """
+        failed = await self.delete_documents([blob_name])
+        if failed:
+            raise HttpResponseError(f"Failed to delete blob: {blob_name}")
+
+    async def delete_documents(self, blob_names: List[str]) -> List[str]:
+        """
+        Delete several documents from blob storage using batch requests.
+
+        Each batch request deletes up to BATCH_DELETE_SIZE blobs. A failure of
+        a single blob does not stop the remaining deletions.
+
+        :param blob_names: Names of the blobs to delete
+        :return: Names of the blobs that could not be deleted
+        """
+        failed = []
+        self._list_cache = None
         try:
-            container_client = await self._get_container_client()
-            blob_client = container_client.get_blob_client(blob_name)
-            await blob_client.delete_blob()
-            logger.info(f"Deleted document from blob storage: {blob_name}")
+            for i in range(0, len(blob_names), self.BATCH_DELETE_SIZE):
+                batch = blob_names[i:i + self.BATCH_DELETE_SIZE]
+                responses = await self._container_client.delete_blobs(
+                    *batch,
+                    raise_on_any_failure=False
+                )
+                # Sub-responses are returned in the order of the request
+                statuses = [response.status_code async for response in responses]
+                for blob_name, status_code in zip(batch, statuses):
+                    if status_code >= 300:
+                        logger.error(
+                            f"Error deleting document {blob_name} from blob storage: HTTP {status_code}")
+                        failed.append(blob_name)
+                    else:
+                        logger.info(f"Deleted document from blob storage: {blob_name}")
+            return failed
         except Exception as e:
-            logger.error(f"Error deleting document from blob storage: {e}")
+            logger.error(f"Error deleting documents from blob storage: {e}")
             raise
     
+    @staticmethod
+    def _blob_to_dict(blob) -> dict:
+        """Convert blob properties to the document dict returned by the listing methods."""
+        return {
+            'name': blob.name,
+            'size': blob.size,
+            'created': blob.creation_time,
+            'metadata': blob.metadata
+        }
+
+    async def iter_documents(self) -> AsyncIterator[dict]:
+        """
+        Iterate over all documents in the container as they are listed.
+
+        :return: Async iterator of document dicts
+        """
+        try:
+            async for blob in self._container_client.list_blobs():
+                yield self._blob_to_dict(blob)
+        except Exception as e:
+            logger.error(f"Error listing documents from blob storage: {e}")
+            raise
+
     async def list_documents(self) -> list:
         """
         List all documents in the container.
 
+        The result is cached for list_cache_ttl seconds and invalidated by
+        uploads and deletions made through this manager.
+
         :return: List of blob names
         """
+        async with self._list_cache_lock:
+            # Concurrent callers wait for a single listing instead of each starting one
+            if self._list_cache is None or time.monotonic() - self._list_cache[0] >= self._list_cache_ttl:
+                documents = [document async for document in self.iter_documents()]
+                self._list_cache = (time.monotonic(), documents)
+            return list(self._list_cache[1])
+
+    async def list_documents_page(
+        self,
+        results_per_page: int = 100,
+        continuation_token: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        List one page of documents in the container.
+
+        :param results_per_page: Maximum number of documents in the page
+        :param continuation_token: Token returned by the previous call, None for the first page
+        :return: Tuple of (documents, continuation token or None if this was the last page)
+        """
         try:
-            container_client = await self._get_container_client()
-            blobs = []
-            async for blob in container_client.list_blobs():
-                blobs.append({
-                    'name': blob.name,
-                    'size': blob.size,
-                    'created': blob.creation_time,
-                    'metadata': blob.metadata
-                })
-            return blobs
+            pages = self._container_client.list_blobs(
+                results_per_page=results_per_page
+            ).by_page(continuation_token=continuation_token)
+            documents = []
+            async for page in pages:
+                documents = [self._blob_to_dict(blob) async for blob in page]
+                break
+            return documents, pages.continuation_token
         except Exception as e:
             logger.error(f"Error listing documents from blob storage: {e}")
             raise
 
+    async def _get_user_delegation_key(self, valid_until: datetime) -> UserDelegationKey:
+        """
+        Return a cached user delegation key, requesting a new one only when needed.
+
+        :param valid_until: Time until which the key must stay valid (UTC)
+        :return: User delegation key
+        """
+        async with self._delegation_key_lock:
+            if self._delegation_key is None or self._delegation_key_expiry < valid_until:
+                now = datetime.utcnow()
+                key_expiry = max(now + self.DELEGATION_KEY_LIFETIME, valid_until)
+                self._delegation_key = await self._blob_service_client.get_user_delegation_key(
+                    key_start_time=now,
+                    key_expiry_time=key_expiry
+                )
+                self._delegation_key_expiry = key_expiry
+            return self._delegation_key
+
     async def generate_sas_url(
         self,
         blob_name: str,
@@ -197,26 +377,12 @@ class BlobStorageManager:
         :return: Blob URL with SAS token
         """
         try:
-            # Get account key from blob service client
-            blob_service_client = await self._get_blob_service_client()
+            expiry = datetime.utcnow() + timedelta(hours=expiry_hours)
 
             # For managed identity, we need to use user delegation key
-            # Get user delegation key
-            delegation_key = await blob_service_client.get_user_delegation_key(
-                key_start_time=datetime.utcnow(),
-                key_expiry_time=datetime.utcnow() + timedelta(hours=expiry_hours)
-            )
-
-            # Generate SAS token using user delegation key
-            from azure.storage.blob import generate_blob_sas, UserDelegationKey, ContentSettings
+            delegation_key = await self._get_user_delegation_key(expiry)
 
-            # Extract original filename from blob_name (remove timestamp prefix)
-            # Format: 20251112_103403_Azure-AI-Foundry...pdf
-            original_filename = blob_name
-            if '_' in blob_name:
-                parts = blob_name.split('_', 2)
-                if len(parts) >= 3:
-                    original_filename = parts[2]
+            original_filename = self._original_filename(blob_name)
 
             # Sanitize filename for content-disposition header to avoid SAS signature issues
             # The content-disposition header must use ASCII-compatible characters
@@ -228,7 +394,7 @@ class BlobStorageManager:
                 blob_name=blob_name,
                 user_delegation_key=delegation_key,
                 permission=BlobSasPermissions(read=True),
-                expiry=datetime.utcnow() + timedelta(hours=expiry_hours),
+                expiry=expiry,
                 content_disposition=f'inline; filename="{sanitized_filename}"',  # Display in browser with sanitized filename
                 content_type='application/pdf'  # Set correct MIME type for PDF
             )
@@ -242,7 +408,6 @@ class BlobStorageManager:
             raise
 
     async def close(self) -> None:
-        """Close blob service client."""
-        if self._blob_service_client:
-            await self._blob_service_client.close()
+        """Close blob service client. Only call this on application shutdown."""
+        await self._blob_service_client.close()
 
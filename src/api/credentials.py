@@ -0,0 +1,57 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+# See LICENSE file in the project root for full license information.
+
+"""Process-wide Azure credential shared by all clients."""
+
+import logging
+import os
+from typing import Optional
+
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.identity.aio import AzureDeveloperCliCredential, ManagedIdentityCredential
+
+from .util import get_logger
+
+logger = get_logger(
+    name="credentials",
+    log_level=logging.INFO,
+    log_to_console=True
+)
+
+_shared_credential: Optional[AsyncTokenCredential] = None
+
+
+def get_shared_credential() -> AsyncTokenCredential:
+    """
+    Return the credential shared by all Azure clients of the process.
+
+    The credential is created on first use, so that all clients share one
+    token cache instead of acquiring tokens independently.
+
+    :return: AzureDeveloperCliCredential for local development,
+             ManagedIdentityCredential when RUNNING_IN_PRODUCTION is set.
+    """
+    global _shared_credential
+    if _shared_credential is None:
+        if not os.getenv("RUNNING_IN_PRODUCTION"):
+            if tenant_id := os.getenv("AZURE_TENANT_ID"):
+                logger.info("Using AzureDeveloperCliCredential with tenant_id %s", tenant_id)
+                _shared_credential = AzureDeveloperCliCredential(tenant_id=tenant_id)
+            else:
+                logger.info("Using AzureDeveloperCliCredential")
+                _shared_credential = AzureDeveloperCliCredential()
+        else:
+            # User-assigned identity was created and set in api.bicep
+            user_identity_client_id = os.getenv("AZURE_CLIENT_ID")
+            logger.info("Using ManagedIdentityCredential with client_id %s", user_identity_client_id)
+            _shared_credential = ManagedIdentityCredential(client_id=user_identity_client_id)
+    return _shared_credential
+
+
+async def close_shared_credential() -> None:
+    """Close the shared credential. Only call this on application shutdown."""
+    global _shared_credential
+    if _shared_credential is not None:
+        await _shared_credential.close()
+        _shared_credential = None
@@ -4,10 +4,18 @@
 
 """Document processor for extracting text from various file formats."""
 
+import asyncio
+import bisect
+import contextlib
 import io
 import logging
-from typing import List, Tuple, Optional, Dict, Any
-from pathlib import Path
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
 
 from .util import get_logger
 
@@ -17,6 +25,234 @@ logger = get_logger(
     log_to_console=True
 )
 
+_punkt_tokenizer = None
+_punkt_lock = threading.Lock()
+
+
+def _load_punkt():
+    """Load the English Punkt sentence tokenizer, downloading it if needed."""
+    import nltk
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer
+    except ImportError:
+        # Older NLTK releases only ship the pickled model
+        try:
+            return nltk.data.load('tokenizers/punkt/english.pickle')
+        except LookupError:
+            nltk.download('punkt', quiet=True)
+            return nltk.data.load('tokenizers/punkt/english.pickle')
+    try:
+        return PunktTokenizer('english')
+    except LookupError:
+        nltk.download('punkt_tab', quiet=True)
+        return PunktTokenizer('english')
+
+
+def get_punkt_tokenizer():
+    """
+    Return the shared Punkt sentence tokenizer.
+
+    The tokenizer is loaded once per process and reused by all callers.
+    """
+    global _punkt_tokenizer
+    if _punkt_tokenizer is None:
+        with _punkt_lock:
+            if _punkt_tokenizer is None:
+                _punkt_tokenizer = _load_punkt()
+    return _punkt_tokenizer
+
+
+class PageMap:
+    """
+    Maps character positions of extracted text to page numbers.
+
+    Stores one start offset per page instead of one entry per character,
+    page lookups are resolved with a binary search.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty page map."""
+        self._offsets: List[int] = []
+        self._page_numbers: List[int] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._offsets)
+
+    def add_page(self, start_pos: int, page_number: int) -> None:
+        """
+        Register the start position of a page.
+
+        Pages must be added in ascending order of their start position.
+
+        :param start_pos: Position of the first character of the page
+        :param page_number: Page number (1-based)
+        """
+        self._offsets.append(start_pos)
+        self._page_numbers.append(page_number)
+
+    def page_for(self, pos: int) -> Optional[int]:
+        """
+        Return the page number for a character position.
+
+        :param pos: Character position in the extracted text
+        :return: Page number or None if the map is empty
+        """
+        index = bisect.bisect_right(self._offsets, pos) - 1
+        if index < 0:
+            return None
+        return self._page_numbers[index]
+
+    def pages_for(self, positions: List[int]) -> List[Optional[int]]:
+        """
+        Return the page numbers for ascending character positions in one pass.
+
+        :param positions: Character positions sorted in ascending order
+        :return: Page number for every position (None if the map is empty)
+        """
+        pages: List[Optional[int]] = []
+        index = -1
+        last_index = len(self._offsets) - 1
+        for pos in positions:
+            while index < last_index and self._offsets[index + 1] <= pos:
+                index += 1
+            pages.append(self._page_numbers[index] if index >= 0 else None)
+        return pages
+
+
+# Binary content, a binary stream or the path of a file
+FileContent = Union[bytes, BinaryIO, str, os.PathLike]
+
+# PDFs with at least this many pages are split across worker processes
+PARALLEL_PDF_MIN_PAGES = 32
+# Size of the worker process pool used for parsing and chunking documents. Every gunicorn
+# worker has its own pool and gunicorn.conf.py starts 2 * cpu + 1 workers, so the default is
+# small per worker. Override it with DOCUMENT_PROCESSOR_WORKERS when running fewer workers.
+PDF_WORKERS = int(os.getenv('DOCUMENT_PROCESSOR_WORKERS') or 2)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared worker process pool, creating it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                # Spawn instead of fork, the server process runs threads and an event loop
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the worker process pool if it was started."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown()
+            _process_pool = None
+
+
+def _read_page_texts(pdf, start: int, stop: int) -> List[str]:
+    """Return the text of the pages in range [start, stop) of an open PDFium document."""
+    texts = []
+    for index in range(start, stop):
+        page = pdf[index]
+        textpage = page.get_textpage()
+        texts.append(textpage.get_text_range())
+        textpage.close()
+        page.close()
+    return texts
+
+
+def _extract_pdf_page_range(path: str, start: int, stop: int) -> List[str]:
+    """
+    Return the text of the pages in range [start, stop) of a PDF file.
+
+    Runs in a worker process, each of which has its own PDFium instance.
+    """
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        return _read_page_texts(pdf, start, stop)
+    finally:
+        pdf.close()
+
+
+def _extract_small_pdf(path: str) -> Tuple[int, Optional[List[str]]]:
+    """
+    Extract the page texts of a PDF file if it is too small to be split.
+
+    Runs in a worker process.
+
+    :return: Tuple of (page count, page texts or None if the PDF should be split)
+    """
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        page_count = len(pdf)
+        if page_count >= PARALLEL_PDF_MIN_PAGES:
+            return page_count, None
+        return page_count, _read_page_texts(pdf, 0, page_count)
+    finally:
+        pdf.close()
+
+
+def _as_stream(file_content: FileContent) -> BinaryIO:
+    """Return a binary stream over the file content without copying it."""
+    if isinstance(file_content, bytes):
+        # BytesIO shares the bytes object until it is written to
+        return io.BytesIO(file_content)
+    return file_content
+
+
+def _as_bytes(file_content: FileContent) -> bytes:
+    """Return the file content as bytes, reading it if a stream or path was given."""
+    if isinstance(file_content, bytes):
+        return file_content
+    if isinstance(file_content, (str, os.PathLike)):
+        with open(file_content, 'rb') as f:
+            return f.read()
+    return file_content.read()
+
+
+def write_temp_file(file_content: FileContent) -> str:
+    """
+    Write the file content to a new temporary file.
+
+    :return: Path of the temporary file, the caller deletes it
+    """
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        if isinstance(file_content, bytes):
+            f.write(file_content)
+        else:
+            shutil.copyfileobj(file_content, f)
+    return f.name
+
+
+@contextlib.asynccontextmanager
+async def _file_path(file_content: FileContent) -> AsyncIterator[str]:
+    """
+    Provide the file content as a path that worker processes can open.
+
+    A path is used as is, bytes and streams are written to a temporary file
+    that is deleted on exit. Workers then receive the path instead of a pickled
+    copy of the whole document.
+    """
+    if isinstance(file_content, (str, os.PathLike)):
+        yield os.fspath(file_content)
+        return
+    path = await asyncio.to_thread(write_temp_file, file_content)
+    try:
+        yield path
+    finally:
+        os.unlink(path)
+
 
 class DocumentProcessor:
     """
@@ -25,7 +261,25 @@ class DocumentProcessor:
     Supports: PDF, DOCX, TXT, MD
     """
     
-    SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.txt', '.md'}
+    # Maps a file extension to the name of its extractor method
+    _EXTRACTORS = {
+        '.pdf': '_extract_from_pdf',
+        '.docx': '_extract_from_docx',
+        '.txt': '_extract_from_text',
+        '.md': '_extract_from_text',
+    }
+    SUPPORTED_EXTENSIONS = frozenset(_EXTRACTORS)
+
+    @staticmethod
+    def _get_extension(filename: str) -> str:
+        """
+        Return the lower-case extension of a filename including the dot.
+
+        :param filename: Name of the file
+        :return: Extension, or an empty string if there is none
+        """
+        dot = filename.rfind('.')
+        return filename[dot:].lower() if dot >= 0 else ''
     
     @staticmethod
     def is_supported(filename: str) -> bool:
@@ -35,106 +289,124 @@ class DocumentProcessor:
         :param filename: Name of the file
         :return: True if supported, False otherwise
         """
-        ext = Path(filename).suffix.lower()
-        return ext in DocumentProcessor.SUPPORTED_EXTENSIONS
+        return DocumentProcessor._get_extension(filename) in DocumentProcessor.SUPPORTED_EXTENSIONS
     
     @staticmethod
-    async def extract_text(file_content: bytes, filename: str) -> Tuple[str, Dict[int, int]]:
+    async def extract_text(file_content: FileContent, filename: str) -> Tuple[str, PageMap]:
         """
         Extract text from document with page mapping.
 
-        :param file_content: Binary content of the file
+        PDF and DOCX parsing is CPU-bound, so it runs in the worker process pool
+        to keep the event loop (and the GIL) free for other requests. Large PDFs
+        are split across several worker processes.
+
+        :param file_content: Binary content of the file, a binary stream positioned at its start or a file path
         :param filename: Name of the file (used to determine type)
-        :return: Tuple of (extracted text, character_position -> page_number mapping)
+        :return: Tuple of (extracted text, page map)
         """
-        ext = Path(filename).suffix.lower()
-
-        if ext == '.pdf':
-            return await DocumentProcessor._extract_from_pdf(file_content)
-        elif ext == '.docx':
-            return await DocumentProcessor._extract_from_docx(file_content)
-        elif ext in {'.txt', '.md'}:
-            return await DocumentProcessor._extract_from_text(file_content)
-        else:
+        ext = DocumentProcessor._get_extension(filename)
+        extractor_name = DocumentProcessor._EXTRACTORS.get(ext)
+        if extractor_name is None:
             raise ValueError(f"Unsupported file format: {ext}")
+        return await getattr(DocumentProcessor, extractor_name)(file_content)
     
     @staticmethod
-    async def _extract_from_pdf(file_content: bytes) -> Tuple[str, Dict[int, int]]:
+    async def _extract_from_pdf(file_content: FileContent) -> Tuple[str, PageMap]:
         """
         Extract text from PDF file with page mapping.
 
-        :param file_content: Binary content of PDF
-        :return: Tuple of (extracted text, character_position -> page_number mapping)
+        Small PDFs are read in a single worker process. PDFs with at least
+        PARALLEL_PDF_MIN_PAGES pages are split into page ranges which are
+        extracted concurrently in worker processes.
+
+        :param file_content: Binary content, stream or path of PDF
+        :return: Tuple of (extracted text, page map)
         """
         try:
-            from PyPDF2 import PdfReader
+            loop = asyncio.get_running_loop()
+            pool = _get_process_pool()
+            async with _file_path(file_content) as path:
+                page_count, page_texts = await loop.run_in_executor(pool, _extract_small_pdf, path)
 
-            pdf_file = io.BytesIO(file_content)
-            reader = PdfReader(pdf_file)
+                if page_texts is None:
+                    # Each worker opens the file itself and reads only its page range
+                    step = -(-page_count // PDF_WORKERS)
+                    ranges = await asyncio.gather(*[
+                        loop.run_in_executor(
+                            pool, _extract_pdf_page_range, path, start, min(start + step, page_count)
+                        )
+                        for start in range(0, page_count, step)
+                    ])
+                    page_texts = [text for page_range in ranges for text in page_range]
 
-            text_parts = []
-            char_to_page = {}  # Maps character position to page number
-            current_pos = 0
+            buffer = io.StringIO()
+            page_map = PageMap()
 
-            for page_num, page in enumerate(reader.pages, 1):
-                text = page.extract_text()
+            for page_num, text in enumerate(page_texts, 1):
                 if text.strip():
-                    page_text = text
-                    text_parts.append(page_text)
-
-                    # Map character positions to page number
-                    page_length = len(page_text)
-                    for i in range(current_pos, current_pos + page_length):
-                        char_to_page[i] = page_num
-
-                    current_pos += page_length + 2  # +2 for "\n\n" separator
+                    if page_map:
+                        buffer.write("\n\n")
+                    # The buffer position is the character offset of the page start
+                    page_map.add_page(buffer.tell(), page_num)
+                    buffer.write(text)
 
-            full_text = "\n\n".join(text_parts)
-            return full_text, char_to_page
+            return buffer.getvalue(), page_map
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
             raise ValueError(f"Failed to extract text from PDF: {str(e)}")
     
     @staticmethod
-    async def _extract_from_docx(file_content: bytes) -> Tuple[str, Dict[int, int]]:
+    async def _extract_from_docx(file_content: FileContent) -> Tuple[str, PageMap]:
         """
-        Extract text from DOCX file.
+        Extract text from DOCX file in a worker process.
 
-        :param file_content: Binary content of DOCX
-        :return: Tuple of (extracted text, empty dict - DOCX has no page numbers)
+        :param file_content: Binary content, stream or path of DOCX
+        :return: Tuple of (extracted text, empty page map - DOCX has no page numbers)
+        """
+        # The worker opens the file itself instead of receiving a pickled copy
+        async with _file_path(file_content) as path:
+            return await asyncio.get_running_loop().run_in_executor(
+                _get_process_pool(), DocumentProcessor._read_docx, path
+            )
+
+    @staticmethod
+    def _read_docx(file_content: FileContent) -> Tuple[str, PageMap]:
+        """
+        Extract text from DOCX file (blocking implementation of _extract_from_docx).
+
+        :param file_content: Binary content, stream or path of DOCX
+        :return: Tuple of (extracted text, empty page map - DOCX has no page numbers)
         """
         try:
             from docx import Document
 
-            docx_file = io.BytesIO(file_content)
-            doc = Document(docx_file)
+            doc = Document(_as_stream(file_content))
 
-            text_parts = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text_parts.append(para.text)
+            # paragraph.text keeps tabs, line breaks and hyperlink runs, read it once per paragraph
+            text_parts = [text for text in (para.text for para in doc.paragraphs) if text.strip()]
 
             full_text = "\n\n".join(text_parts)
-            return full_text, {}  # DOCX has no page numbers
+            return full_text, PageMap()  # DOCX has no page numbers
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {e}")
             raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
     
     @staticmethod
-    async def _extract_from_text(file_content: bytes) -> Tuple[str, Dict[int, int]]:
+    async def _extract_from_text(file_content: FileContent) -> Tuple[str, PageMap]:
         """
         Extract text from plain text file.
 
-        :param file_content: Binary content of text file
-        :return: Tuple of (decoded text, empty dict - text files have no page numbers)
+        :param file_content: Binary content or stream of text file
+        :return: Tuple of (decoded text, empty page map - text files have no page numbers)
         """
         try:
-            # Try UTF-8 first, fallback to latin-1
+            data = _as_bytes(file_content)
+            # Try UTF-8 first (stripping a BOM if present), fallback to latin-1
             try:
-                text = file_content.decode('utf-8')
+                text = data.decode('utf-8-sig')
             except UnicodeDecodeError:
-                text = file_content.decode('latin-1')
-            return text, {}  # Text files have no page numbers
+                text = data.decode('latin-1')
+            return text, PageMap()  # Text files have no page numbers
         except Exception as e:
             logger.error(f"Error extracting text from text file: {e}")
             raise ValueError(f"Failed to extract text from text file: {str(e)}")
@@ -142,56 +414,58 @@ class DocumentProcessor:
     @staticmethod
     async def chunk_text(
         text: str,
-        char_to_page: Dict[int, int],
+        page_map: PageMap,
         sentences_per_chunk: int = 4
     ) -> List[Dict[str, Any]]:
         """
         Split text into chunks based on sentences with page number tracking.
 
+        Sentence tokenization is CPU-bound and runs in a worker process.
+
         :param text: Text to chunk
-        :param char_to_page: Mapping of character position to page number
+        :param page_map: Mapping of character position to page number
         :param sentences_per_chunk: Number of sentences per chunk
         :return: List of chunk dictionaries with 'text' and 'page_number' keys
         """
-        try:
-            import nltk
-            try:
-                nltk.data.find('tokenizers/punkt')
-            except LookupError:
-                nltk.download('punkt', quiet=True)
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_process_pool(), DocumentProcessor._chunk_text, text, page_map, sentences_per_chunk
+        )
 
-            sentences = nltk.sent_tokenize(text)
+    @staticmethod
+    def _chunk_text(
+        text: str,
+        page_map: PageMap,
+        sentences_per_chunk: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Split text into sentence chunks (blocking implementation of chunk_text).
+
+        :param text: Text to chunk
+        :param page_map: Mapping of character position to page number
+        :param sentences_per_chunk: Number of sentences per chunk
+        :return: List of chunk dictionaries with 'text' and 'page_number' keys
+        """
+        try:
+            spans = list(get_punkt_tokenizer().span_tokenize(text))
 
-            chunks = []
-            current_pos = 0
+            chunk_texts = []
+            chunk_starts = []
 
-            for i in range(0, len(sentences), sentences_per_chunk):
-                chunk_text = ' '.join(sentences[i:i + sentences_per_chunk])
+            for i in range(0, len(spans), sentences_per_chunk):
+                window = spans[i:i + sentences_per_chunk]
+                # Slice the chunk directly from the text using the sentence offsets
+                chunk_start_pos = window[0][0]
+                chunk_text = text[chunk_start_pos:window[-1][1]]
                 if chunk_text.strip():
-                    # Find the page number for this chunk (use the first character's page)
-                    chunk_start_pos = text.find(chunk_text, current_pos)
-
-                    # Find the page number by looking for the nearest mapped position
-                    # This handles cases where chunk_start_pos falls on a separator
-                    page_number = None
-                    if char_to_page:
-                        # Try exact position first
-                        if chunk_start_pos in char_to_page:
-                            page_number = char_to_page[chunk_start_pos]
-                        else:
-                            # Find the next available position in the mapping
-                            for offset in range(10):  # Look ahead up to 10 characters
-                                test_pos = chunk_start_pos + offset
-                                if test_pos in char_to_page:
-                                    page_number = char_to_page[test_pos]
-                                    break
-
-                    chunks.append({
-                        'text': chunk_text,
-                        'page_number': page_number
-                    })
-
-                    current_pos = chunk_start_pos + len(chunk_text)
+                    chunk_texts.append(chunk_text)
+                    chunk_starts.append(chunk_start_pos)
+
+            # Use the page of each chunk's first character, resolved in a single pass
+            page_numbers = page_map.pages_for(chunk_starts)
+            chunks = [
+                {'text': chunk_text, 'page_number': page_number}
+                for chunk_text, page_number in zip(chunk_texts, page_numbers)
+            ]
 
             return chunks
         except Exception as e:
@@ -1,41 +1,64 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license.
 # See LICENSE file in the project root for full license information.
+import asyncio
 import contextlib
 import logging
 import os
-from typing import Union
 from urllib.parse import urlparse
 
 import fastapi
 from azure.ai.projects.aio import AIProjectClient
 from azure.ai.inference.aio import ChatCompletionsClient, EmbeddingsClient
-from azure.identity import AzureDeveloperCliCredential, ManagedIdentityCredential
 from dotenv import load_dotenv
 from fastapi.staticfiles import StaticFiles
 
+from .credentials import close_shared_credential, get_shared_credential
 from .search_index_manager import SearchIndexManager
 from .blob_storage_manager import BlobStorageManager
-from .util import get_logger
+from .document_processor import shutdown_process_pool
+from .util import ChatRequest, Message, get_logger
 
 logger = None
 enable_trace = False
 
+
+async def warm_up(
+    chat: ChatCompletionsClient,
+    chat_model: str,
+    search_index_manager: SearchIndexManager,
+    blob_storage_manager: BlobStorageManager
+) -> None:
+    """
+    Prime templates, connection pools and tokens so the first request does not pay for them.
+
+    Failures are only logged, the app works without a warm-up.
+
+    :param chat: The chat completions client
+    :param chat_model: The chat deployment name
+    :param search_index_manager: The search index manager or None if RAG is disabled
+    :param blob_storage_manager: The blob storage manager or None if blob storage is disabled
+    """
+    from . import routes
+
+    routes.render_template("index.html")
+    warmups = [chat.complete(
+        model=chat_model, messages=[{"role": "user", "content": "ping"}], max_tokens=1
+    )]
+    if search_index_manager is not None:
+        warmups.append(search_index_manager.search(ChatRequest(messages=[Message(content="ping")])))
+    if blob_storage_manager is not None:
+        # Fetches and caches the user delegation key, the blob does not need to exist
+        warmups.append(blob_storage_manager.generate_sas_url("warmup", expiry_hours=routes.SAS_EXPIRY_HOURS))
+    for result in await asyncio.gather(*warmups, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.warning(f"Warm-up request failed: {result}")
+    logger.info("Warm-up finished.")
+
 @contextlib.asynccontextmanager
 async def lifespan(app: fastapi.FastAPI):
-    azure_credential: Union[AzureDeveloperCliCredential, ManagedIdentityCredential]
-    if not os.getenv("RUNNING_IN_PRODUCTION"):
-        if tenant_id := os.getenv("AZURE_TENANT_ID"):
-            logger.info("Using AzureDeveloperCliCredential with tenant_id %s", tenant_id)
-            azure_credential = AzureDeveloperCliCredential(tenant_id=tenant_id)
-        else:
-            logger.info("Using AzureDeveloperCliCredential")
-            azure_credential = AzureDeveloperCliCredential()
-    else:
-        # User-assigned identity was created and set in api.bicep
-        user_identity_client_id = os.getenv("AZURE_CLIENT_ID")
-        logger.info("Using ManagedIdentityCredential with client_id %s", user_identity_client_id)
-        azure_credential = ManagedIdentityCredential(client_id=user_identity_client_id)
+    # One async credential is shared by all clients for the lifetime of the app
+    azure_credential = get_shared_credential()
 
     endpoint = os.environ["AZURE_EXISTING_AIPROJECT_ENDPOINT"]
     project = AIProjectClient(
@@ -119,6 +142,9 @@ async def lifespan(app: fastapi.FastAPI):
     app.state.blob_storage_manager = blob_storage_manager
     app.state.embeddings_client = embed
     app.state.chat_model = os.environ["AZURE_AI_CHAT_DEPLOYMENT_NAME"]
+
+    if os.getenv("RAG_WARMUP", "").lower() == "true":
+        await warm_up(chat, app.state.chat_model, search_index_manager, blob_storage_manager)
     yield
 
     await project.close()
@@ -127,6 +153,8 @@ async def lifespan(app: fastapi.FastAPI):
         await search_index_manager.close()
     if blob_storage_manager is not None:
         await blob_storage_manager.close()
+    shutdown_process_pool()
+    await close_shared_credential()
 
 
 def create_app():
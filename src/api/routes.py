@@ -1,15 +1,20 @@
 # Copyright (c) Microsoft. All rights reserved.
 # Licensed under the MIT license.
 # See LICENSE file in the project root for full license information.
-import json
+import asyncio
+import functools
 import logging
 import os
-from typing import Dict
-from urllib.parse import quote
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlsplit
 
 import fastapi
+import orjson
 from fastapi import Request, Depends, UploadFile, File
-from fastapi.responses import HTMLResponse, StreamingResponse, JSONResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from azure.ai.inference.prompts import PromptTemplate
 from azure.ai.inference.aio import ChatCompletionsClient
@@ -17,7 +22,7 @@ from azure.ai.inference.aio import ChatCompletionsClient
 from .util import get_logger, ChatRequest
 from .search_index_manager import SearchIndexManager
 from .blob_storage_manager import BlobStorageManager
-from .document_processor import DocumentProcessor
+from .document_processor import DocumentProcessor, write_temp_file
 from azure.core.exceptions import HttpResponseError
 
 
@@ -34,37 +39,190 @@ router = fastapi.APIRouter()
 templates = Jinja2Templates(directory="api/templates")
 
 
-# Accessors to get app state
-def get_chat_client(request: Request) -> ChatCompletionsClient:
+# Accessors to get app state, async so FastAPI resolves them on the event loop
+# instead of dispatching each one to its thread pool
+async def get_chat_client(request: Request) -> ChatCompletionsClient:
     return request.app.state.chat
 
 
-def get_chat_model(request: Request) -> str:
+async def get_chat_model(request: Request) -> str:
     return request.app.state.chat_model
 
 
-def get_search_index_manager(request: Request) -> SearchIndexManager:
+async def get_search_index_manager(request: Request) -> SearchIndexManager:
     return request.app.state.search_index_manager
 
 
-def get_blob_storage_manager(request: Request) -> BlobStorageManager:
+async def get_blob_storage_manager(request: Request) -> BlobStorageManager:
     return request.app.state.blob_storage_manager
 
 
-def serialize_sse_event(data: Dict) -> str:
-    return f"data: {json.dumps(data)}\n\n"
+# Maximum number of already queued deltas coalesced into one SSE frame
+STREAM_FLUSH_TOKENS = 8
+# Maximum number of deltas buffered between the completion reader and the SSE writer
+STREAM_QUEUE_SIZE = 64
 
+# SAS URLs are minted with a 24-hour expiry and reused for 23 hours
+SAS_EXPIRY_HOURS = 24
+SAS_CACHE_TTL = 23 * 3600  # seconds
+SAS_CACHE_MAX_SIZE = 1024
+# blob name -> (SAS URL without page fragment, monotonic expiry time)
+_sas_url_cache: Dict[str, Tuple[str, float]] = {}
+# Source URLs that already carry a SAS token valid for at least this long are kept
+SAS_MIN_REMAINING = timedelta(hours=1)
 
-@router.get("/", response_class=HTMLResponse)
-async def index_name(request: Request):
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-        }
+# Prompt templates are parsed once at import
+_DEFAULT_PROMPT_MESSAGES = PromptTemplate.from_string('You are a helpful assistant').create_messages()
+_CONTEXT_PROMPT = PromptTemplate.from_string(
+    'You are a helpful assistant that answers some questions '
+    'with the help of some context data.\n\nHere is '
+    'the context data:\n\n{{context}}')
+
+# Constant envelope of the per-token "message" event, only the content is serialized per token
+_MESSAGE_EVENT_PREFIX = b'data: {"type":"message","content":'
+_MESSAGE_EVENT_SUFFIX = b'}\n\n'
+
+
+def serialize_sse_event(data: Dict) -> bytes:
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def serialize_message_event(content: str) -> bytes:
+    return _MESSAGE_EVENT_PREFIX + orjson.dumps(content) + _MESSAGE_EVENT_SUFFIX
+
+
+def get_blob_name(url: str) -> str:
+    """
+    Extract the decoded blob name from a blob URL, ignoring query string and fragment.
+
+    :param url: Blob URL
+    :return: Blob name
+    """
+    return unquote(urlsplit(url).path.rpartition('/')[2])
+
+
+def has_valid_sas(url: str) -> bool:
+    """
+    Check if the URL already carries a SAS token which stays valid for at least SAS_MIN_REMAINING.
+
+    :param url: Blob URL, optionally with a SAS query string
+    :return: True if the URL can be used as-is
+    """
+    expiry = parse_qs(urlsplit(url).query).get('se')
+    if not expiry:
+        return False
+    try:
+        # fromisoformat only accepts the "Z" suffix from Python 3.11 on
+        expires_at = datetime.fromisoformat(expiry[0].replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at - datetime.now(timezone.utc) > SAS_MIN_REMAINING
+
+
+def get_content_filter_message(error: Exception) -> Optional[str]:
+    """
+    Describe the safety issues if the error was raised by the content filter.
+
+    Uses the error body azure-core already parsed when raising the exception.
+
+    :param error: Exception raised while streaming the completion
+    :return: Message listing the filtered categories, None for other errors
+    """
+    if not isinstance(error, HttpResponseError):
+        return None
+    odata_error = error.error
+    if odata_error is None or odata_error.code != 'content_filter':
+        return None
+    rai_dict = (odata_error.innererror or {}).get('content_filter_result', {})
+    errors = []
+    for k, v in rai_dict.items():
+        if v.get('filtered'):
+            if 'severity' in v:
+                errors.append(f"{k}, severity: {v['severity']}")
+            else:
+                errors.append(k)
+    return f"We have found the next safety issues in the response: {', '.join(errors)}"
+
+
+async def get_sas_url(blob_name: str, blob_storage_manager: BlobStorageManager) -> str:
+    """
+    Return a SAS URL for the blob, reusing a cached one while it is still valid.
+
+    :param blob_name: Name of the blob
+    :param blob_storage_manager: Blob storage manager used to sign the URL
+    :return: Blob URL with SAS token
+    """
+    now = time.monotonic()
+    entry = _sas_url_cache.get(blob_name)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    sas_url = await blob_storage_manager.generate_sas_url(blob_name, expiry_hours=SAS_EXPIRY_HOURS)
+    if len(_sas_url_cache) >= SAS_CACHE_MAX_SIZE:
+        # Drop expired entries, start over if all of them are still valid
+        for name in [name for name, (_, expiry) in _sas_url_cache.items() if expiry <= now]:
+            del _sas_url_cache[name]
+        if len(_sas_url_cache) >= SAS_CACHE_MAX_SIZE:
+            _sas_url_cache.clear()
+    _sas_url_cache[blob_name] = (sas_url, now + SAS_CACHE_TTL)
+    return sas_url
+
+
+async def add_sas_urls(sources: List[Dict], blob_storage_manager: BlobStorageManager) -> None:
+    """
+    Replace the blob URLs of the sources with SAS URLs, generating them concurrently.
+
+    URLs which already carry a sufficiently long-lived SAS token are kept.
+
+    :param sources: Source metadata returned by the search, updated in place
+    :param blob_storage_manager: Blob storage manager used to sign the URLs
+    """
+    linked_sources = []
+    blob_names = []
+    for source in sources:
+        if 'url' in source and source['url']:
+            if has_valid_sas(source['url']):
+                if source.get('page_number') is not None and '#' not in source['url']:
+                    source['url'] += f"#page={source['page_number']}"
+                continue
+            blob_names.append(get_blob_name(source['url']))
+            linked_sources.append(source)
+
+    results = await asyncio.gather(
+        *[get_sas_url(blob_name, blob_storage_manager) for blob_name in blob_names],
+        return_exceptions=True
     )
+    for source, blob_name, sas_url in zip(linked_sources, blob_names, results):
+        if isinstance(sas_url, Exception):
+            logger.error(f"Error generating SAS URL for {blob_name}: {sas_url}")
+            continue
 
-@router.post("/chat")
+        # Add page number fragment if available
+        if source.get('page_number') is not None:
+            sas_url += f"#page={source['page_number']}"
+
+        source['url'] = sas_url
+
+
+@functools.lru_cache(maxsize=None)
+def render_template(name: str) -> str:
+    """
+    Render a template without per-request data once and cache the HTML.
+
+    :param name: Name of the template
+    :return: Rendered HTML
+    """
+    return templates.get_template(name).render()
+
+
+@router.get("/", response_class=HTMLResponse)
+async def index_name():
+    # index.html does not depend on the request, it is rendered only once
+    return HTMLResponse(render_template("index.html"))
+
+@router.post("/chat", response_class=StreamingResponse, response_model=None)
 async def chat_stream_handler(
     chat_request: ChatRequest,
     chat_client: ChatCompletionsClient = Depends(get_chat_client),
@@ -82,9 +240,10 @@ async def chat_stream_handler(
         raise Exception("Chat client not initialized")
 
     async def response_stream():
-        messages = [{"role": message.role, "content": message.content} for message in chat_request.messages]
+        # Message has exactly the role and content fields, dump them with pydantic's serializer
+        messages = chat_request.model_dump(include={'messages'})['messages']
 
-        prompt_messages = PromptTemplate.from_string('You are a helpful assistant').create_messages()
+        prompt_messages = _DEFAULT_PROMPT_MESSAGES
         sources = []
         # Use RAG model, only if we were provided index and we have found a context there.
         if search_index_manager is not None:
@@ -92,80 +251,69 @@ async def chat_stream_handler(
 
             # Generate SAS URLs for sources if blob storage manager is available
             if sources and blob_storage_manager is not None:
-                for source in sources:
-                    if 'url' in source and source['url']:
-                        # Extract blob name from URL
-                        blob_name = source['url'].split('/')[-1]
-                        # Remove query parameters if any
-                        blob_name = blob_name.split('?')[0]
-                        try:
-                            # Generate SAS URL with 24-hour expiry
-                            sas_url = await blob_storage_manager.generate_sas_url(blob_name, expiry_hours=24)
-
-                            # Add page number fragment if available
-                            if source.get('page_number') is not None:
-                                sas_url += f"#page={source['page_number']}"
-
-                            source['url'] = sas_url
-                        except Exception as e:
-                            logger.error(f"Error generating SAS URL for {blob_name}: {e}")
+                await add_sas_urls(sources, blob_storage_manager)
 
             if context:
-                prompt_messages = PromptTemplate.from_string(
-                    'You are a helpful assistant that answers some questions '
-                    'with the help of some context data.\n\nHere is '
-                    'the context data:\n\n{{context}}').create_messages(data=dict(context=context))
+                prompt_messages = _CONTEXT_PROMPT.create_messages(data=dict(context=context))
                 logger.info(f"{prompt_messages=}")
             else:
                 logger.info("Unable to find the relevant information in the index for the request.")
         try:
-            accumulated_message = ""
+            message_parts = []
             chat_coroutine = await chat_client.complete(
                 model=model_deployment_name, messages=prompt_messages + messages, stream=True
             )
-            async for event in chat_coroutine:
-                if event.choices:
-                    first_choice = event.choices[0]
-                    if first_choice.delta.content:
-                        message = first_choice.delta.content
-                        accumulated_message += message
-                        yield serialize_sse_event({
-                                        "content": message,
-                                        "type": "message",
-                                    }
-                                )
+            # Read the completion in a separate task so a slow client does not stall it
+            deltas: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+            async def read_completion():
+                try:
+                    async for event in chat_coroutine:
+                        if event.choices and event.choices[0].delta.content:
+                            await deltas.put(event.choices[0].delta.content)
+                except Exception as e:
+                    await deltas.put(e)
+                else:
+                    await deltas.put(None)
+
+            reader = asyncio.create_task(read_completion())
+            try:
+                finished = False
+                while not finished:
+                    # Wait for the next delta, then coalesce the deltas that are already queued.
+                    # The frame is sent as soon as the queue is empty, so no delta is held back.
+                    pending_parts = []
+                    message = await deltas.get()
+                    while True:
+                        if message is None:
+                            finished = True
+                            break
+                        if isinstance(message, Exception):
+                            raise message
+                        pending_parts.append(message)
+                        if len(pending_parts) >= STREAM_FLUSH_TOKENS or deltas.empty():
+                            break
+                        message = deltas.get_nowait()
+                    if pending_parts:
+                        message_parts.extend(pending_parts)
+                        yield serialize_message_event("".join(pending_parts))
+            finally:
+                reader.cancel()
 
             # Send completed message with sources
             yield serialize_sse_event({
-                "content": accumulated_message,
+                "content": "".join(message_parts),
                 "type": "completed_message",
                 "sources": sources
             })
-        except BaseException as e:
-            error_processed = False
-            response = "There is an error!"
-            try:
-                if '(content_filter)' in e.args[0]:
-                    rai_dict = e.response.json()['error']['innererror']['content_filter_result']
-                    errors = []
-                    for k, v in rai_dict.items():
-                        if v['filtered']:
-                            if 'severity' in v:
-                                errors.append(f"{k}, severity: {v['severity']}")
-                            else:
-                                errors.append(k)
-                    error_text = f"We have found the next safety issues in the response: {', '.join(errors)}"
-                    logger.error(error_text)
-                    response = error_text
-                    error_processed = True
-            except BaseException:
-                pass
-            if not error_processed:
-                error_text = str(e)
-                logger.error(error_text)
-                response = error_text
+        except asyncio.CancelledError:
+            # The client disconnected, stop consuming the completion
+            raise
+        except Exception as e:
+            error_text = get_content_filter_message(e) or str(e)
+            logger.error(error_text)
             yield serialize_sse_event({
-                            "content": response,
+                            "content": error_text,
                             "type": "completed_message",
                         })
         yield serialize_sse_event({
@@ -175,66 +323,105 @@ async def chat_stream_handler(
     return StreamingResponse(response_stream(), headers=headers)
 
 
-@router.post("/upload")
+async def delete_created_blob(upload_task: asyncio.Task, blob_storage_manager: BlobStorageManager) -> None:
+    """
+    Delete the blob of a finished upload task if the upload created it.
+
+    A blob that was already stored with the same content is kept, it may be
+    referenced by indexed chunks of an earlier upload.
+
+    :param upload_task: Task running BlobStorageManager.upload_document
+    :param blob_storage_manager: Blob storage manager
+    """
+    if not upload_task.done() or upload_task.cancelled() or upload_task.exception() is not None:
+        return
+    blob_url, created = upload_task.result()
+    if not created:
+        return
+    blob_name = get_blob_name(blob_url)
+    try:
+        await blob_storage_manager.delete_document(blob_name)
+    except Exception as e:
+        logger.warning(f"Failed to delete blob {blob_name} of the failed upload: {e}")
+
+
+@router.post("/upload", response_class=ORJSONResponse, response_model=None)
 async def upload_document(
     file: UploadFile = File(...),
     search_index_manager: SearchIndexManager = Depends(get_search_index_manager),
     blob_storage_manager: BlobStorageManager = Depends(get_blob_storage_manager)
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Upload and process a document for RAG.
 
     Steps:
     1. Validate file format
-    2. Extract text from document
-    3. Upload to blob storage
-    4. Chunk text
-    5. Generate embeddings and index
+    2. Extract text from document and upload it to blob storage concurrently
+    3. Chunk text
+    4. Generate embeddings and index
     """
     try:
         # Check if RAG is enabled
         if search_index_manager is None or blob_storage_manager is None:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "RAG functionality is not enabled"}
             )
 
         # Validate file format
         if not DocumentProcessor.is_supported(file.filename):
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": f"Unsupported file format. Supported: {', '.join(DocumentProcessor.SUPPORTED_EXTENSIONS)}"}
             )
 
-        # Read file content
-        file_content = await file.read()
-
-        # Extract text from document with page mapping
-        logger.info(f"Extracting text from {file.filename}")
-        text, char_to_page = await DocumentProcessor.extract_text(file_content, file.filename)
+        # Extraction reads a copy in a temporary file while the upload streams from the
+        # spooled file, so both run concurrently without sharing a file position
+        temp_path = Path(await asyncio.to_thread(write_temp_file, file.file))
+        try:
+            await file.seek(0)
+            # URL-encode filename for metadata to avoid invalid characters
+            encoded_filename = quote(file.filename, safe='')
+
+            logger.info(f"Extracting text from {file.filename} and uploading it to blob storage")
+            extract_task = asyncio.create_task(DocumentProcessor.extract_text(temp_path, file.filename))
+            upload_task = asyncio.create_task(blob_storage_manager.upload_document(
+                filename=file.filename,
+                file_content=file.file,
+                metadata={"original_filename": encoded_filename}
+            ))
+            try:
+                (text, page_map), (blob_url, _) = await asyncio.gather(extract_task, upload_task)
+            except asyncio.CancelledError:
+                # The client disconnected, a blob this request already created is removed in the background
+                extract_task.cancel()
+                upload_task.cancel()
+                await asyncio.shield(asyncio.ensure_future(
+                    delete_created_blob(upload_task, blob_storage_manager)
+                ))
+                raise
+            except Exception:
+                extract_task.cancel()
+                upload_task.cancel()
+                await delete_created_blob(upload_task, blob_storage_manager)
+                raise
+        finally:
+            os.unlink(temp_path)
 
         if not text.strip():
-            return JSONResponse(
+            # Remove the blob uploaded alongside the failed extraction
+            await delete_created_blob(upload_task, blob_storage_manager)
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "No text could be extracted from the document"}
             )
 
-        # Upload to blob storage
-        logger.info(f"Uploading {file.filename} to blob storage")
-        # URL-encode filename for metadata to avoid invalid characters
-        encoded_filename = quote(file.filename, safe='')
-        blob_url = await blob_storage_manager.upload_document(
-            filename=file.filename,
-            file_content=file_content,
-            metadata={"original_filename": encoded_filename}
-        )
-
         # Chunk text with page number tracking
         logger.info(f"Chunking text from {file.filename}")
-        chunks = await DocumentProcessor.chunk_text(text, char_to_page, sentences_per_chunk=4)
+        chunks = await DocumentProcessor.chunk_text(text, page_map, sentences_per_chunk=4)
 
         if not chunks:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={"error": "No chunks could be created from the document"}
             )
@@ -249,7 +436,7 @@ async def upload_document(
 
         logger.info(f"Successfully processed {file.filename}")
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "message": "Document uploaded and indexed successfully",
@@ -261,19 +448,19 @@ async def upload_document(
 
     except ValueError as e:
         logger.error(f"Validation error: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={"error": str(e)}
         )
     except Exception as e:
         logger.error(f"Error processing document: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to process document: {str(e)}"}
         )
 
 
-@router.delete("/delete-all-chunks")
+@router.delete("/delete-all-chunks", response_class=ORJSONResponse, response_model=None)
 async def delete_all_chunks(
     search_index_manager: SearchIndexManager = Depends(get_search_index_manager)
 ):
@@ -293,7 +480,7 @@ async def delete_all_chunks(
 
         logger.info(f"Successfully deleted {deleted_count} chunks from search index")
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "message": "All chunks deleted successfully",
@@ -303,7 +490,7 @@ async def delete_all_chunks(
 
     except Exception as e:
         logger.error(f"Error deleting all chunks: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to delete chunks: {str(e)}"}
         )
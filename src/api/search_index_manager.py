@@ -1,11 +1,22 @@
-from typing import Optional
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, Optional
+import asyncio
+import collections
+import contextlib
+import hashlib
+import multiprocessing
+import os
 import re
+import time
 
-import glob
 import csv
-import json
+
+import aiohttp
+import orjson
 
 from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.pipeline.transport import AioHttpTransport
 from azure.search.documents.aio import SearchClient
 from azure.search.documents.indexes.aio import SearchIndexClient
 from azure.search.documents.models import VectorizedQuery
@@ -16,12 +27,53 @@ from azure.search.documents.indexes.models import (
     SearchIndex,
     VectorSearch,
     VectorSearchProfile,
-    HnswAlgorithmConfiguration)
+    HnswAlgorithmConfiguration,
+    HnswParameters,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters)
 from azure.ai.inference.aio import EmbeddingsClient
 from azure.core.exceptions import ResourceNotFoundError, HttpResponseError
+from .document_processor import get_punkt_tokenizer
 from .util import ChatRequest
 
 
+@contextlib.asynccontextmanager
+async def _open_index_client(
+        endpoint: str,
+        credential: AsyncTokenCredential,
+        ix_client: Optional[SearchIndexClient] = None) -> AsyncIterator[SearchIndexClient]:
+    """Yield the given index client, or a new one which is closed on exit if none was given."""
+    if ix_client is not None:
+        yield ix_client
+    else:
+        async with SearchIndexClient(endpoint=endpoint, credential=credential) as new_client:
+            yield new_client
+
+
+def _read_sentences(file_name: str) -> list[str]:
+    """
+    Split the informative lines of a file into sentences.
+
+    Runs in a worker process of build_embeddings_file.
+
+    :param file_name: The file to read.
+    :return: The sentences of the file.
+    """
+    tokenize = get_punkt_tokenizer().tokenize
+    min_line_length = SearchIndexManager.MIN_LINE_LENGTH
+    min_diff_characters = SearchIndexManager.MIN_DIFF_CHARACTERS_IN_LINE
+    has_distinct_characters = SearchIndexManager._has_distinct_characters
+    with open(file_name, encoding='utf-8', errors='replace') as f:
+        lines = f.read().splitlines()
+    sentences = []
+    for line in lines:
+        line = line.strip()
+        # Skip non informative lines.
+        if len(line) >= min_line_length and has_distinct_characters(line, min_diff_characters):
+            sentences.extend(tokenize(line))
+    return sentences
+
+
 class SearchIndexManager:
     """
     The class for searching of context for user queries.
@@ -34,10 +86,32 @@ class SearchIndexManager:
     :param model: The embedding model to be used,
                   must be the same as one use to build the file with embeddings.
     :param embeddings_client: The embedding client.
+    :param k_nearest_neighbors: The number of chunks retrieved for a question.
+    :param hnsw_parameters: The HNSW parameters used when the index is created,
+                            DEFAULT_HNSW_PARAMETERS if not set.
     """
     
     MIN_DIFF_CHARACTERS_IN_LINE = 5
     MIN_LINE_LENGTH = 5
+    # Number of texts sent in one embeddings request
+    EMBEDDING_BATCH_SIZE = 2000
+    # Number of embeddings requests in flight at the same time
+    MAX_CONCURRENT_EMBEDDINGS = 5
+    # Number of chunk embeddings kept to skip embedding repeated chunk texts,
+    # each one takes dimensions * 4 bytes as they are stored as float32 arrays
+    EMBEDDING_CACHE_SIZE = int(os.getenv('AZURE_AI_EMBED_CACHE_SIZE') or 256)
+    # Candidate numbers of documents sent in one indexing request, the first
+    # upload probes them and keeps the one with the best throughput
+    UPLOAD_BATCH_SIZES = (100, 200, 500, 1000)
+    # Number of indexing requests in flight at the same time
+    MAX_CONCURRENT_UPLOADS = 4
+    # Connection pool limits of the HTTP session shared by all clients of the manager
+    MAX_CONNECTIONS = 100
+    MAX_CONNECTIONS_PER_HOST = 50
+    # Larger m and ef_construction improve the graph quality at the cost of indexing time
+    # and memory, larger ef_search improves recall at the cost of query latency.
+    # The service accepts m between 4 and 10.
+    DEFAULT_HNSW_PARAMETERS = HnswParameters(m=10, ef_construction=200, ef_search=100, metric="cosine")
     
     def __init__(
             self,
@@ -47,6 +121,8 @@ class SearchIndexManager:
             dimensions: Optional[int],
             model: str,
             embeddings_client: EmbeddingsClient,
+            k_nearest_neighbors: int = 5,
+            hnsw_parameters: Optional[HnswParameters] = None,
         ) -> None:
         """Constructor."""
         self._dimensions = dimensions
@@ -57,12 +133,44 @@ class SearchIndexManager:
         self._index = None
         self._model = model
         self._client = None
+        self._k_nearest_neighbors = k_nearest_neighbors
+        self._upload_batch_size: Optional[int] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Hash of the chunk text -> embedding, in least recently used order
+        self._embedding_cache: collections.OrderedDict[bytes, array] = collections.OrderedDict()
+        self._hnsw_parameters = hnsw_parameters or SearchIndexManager.DEFAULT_HNSW_PARAMETERS
+
+    def _get_transport(self) -> AioHttpTransport:
+        """
+        Return a new transport on the HTTP session shared by all clients of the manager.
+
+        The session keeps the connections to the search service alive between requests
+        and clients, it is closed in close().
+        """
+        if self._session is None:
+            # The remaining session settings match the ones the SDK uses for its own sessions.
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=SearchIndexManager.MAX_CONNECTIONS,
+                    limit_per_host=SearchIndexManager.MAX_CONNECTIONS_PER_HOST,
+                    ttl_dns_cache=300),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                auto_decompress=False,
+                trust_env=True
+            )
+        return AioHttpTransport(session=self._session, session_owner=False)
+
+    def _get_index_client(self) -> SearchIndexClient:
+        """Return a new index client on the shared HTTP session."""
+        return SearchIndexClient(
+            endpoint=self._endpoint, credential=self._credential, transport=self._get_transport())
 
     def _get_client(self):
         """Get search client if it is absent."""
         if self._client is None:
             self._client = SearchClient(
-                endpoint=self._endpoint, index_name=self._index.name, credential=self._credential)
+                endpoint=self._endpoint, index_name=self._index.name, credential=self._credential,
+                transport=self._get_transport())
         return self._client
 
     @staticmethod
@@ -104,11 +212,82 @@ class SearchIndexManager:
 
         return result
 
-    async def search(self, message: ChatRequest) -> tuple[str, list[dict]]:
+    async def _embed_texts(
+            self,
+            texts: list[str],
+            max_in_flight: int = MAX_CONCURRENT_EMBEDDINGS
+            ) -> list[list[float]]:
+        """
+        Embed the texts in batches of EMBEDDING_BATCH_SIZE, sending the batches concurrently.
+
+        :param texts: The texts to embed.
+        :param max_in_flight: The maximal number of embeddings requests sent at the same time.
+        :return: The embeddings in the order of the texts.
+        """
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def embed_batch(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._embed_batch(batch)
+
+        batch_size = SearchIndexManager.EMBEDDING_BATCH_SIZE
+        batches = await asyncio.gather(*[
+            embed_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)
+        ])
+        return [embedding for batch in batches for embedding in batch]
+
+    async def _embed_texts_cached(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed the texts, reusing the embeddings of texts seen before.
+
+        Repeated texts (headers, footers, boilerplate) are only sent once.
+
+        :param texts: The texts to embed.
+        :return: The embeddings in the order of the texts.
+        """
+        keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts]
+        found = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in self._embedding_cache:
+                self._embedding_cache.move_to_end(key)
+                found[key] = self._embedding_cache[key].tolist()
+            else:
+                missing[key] = text
+        if missing:
+            embeddings = await self._embed_texts(list(missing.values()))
+            for key, embedding in zip(missing, embeddings):
+                found[key] = embedding
+                self._embedding_cache[key] = array('f', embedding)
+            while len(self._embedding_cache) > SearchIndexManager.EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        return [found[key] for key in keys]
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed the texts in one request.
+
+        :param texts: The texts to embed.
+        :return: The embeddings in the order of the texts.
+        """
+        response = await self._embeddings_client.embed(
+            input=texts,
+            dimensions=self._dimensions,
+            model=self._model
+        )
+        return [item['embedding'] for item in response['data']]
+
+    async def search(
+            self,
+            message: ChatRequest,
+            k_nearest_neighbors: Optional[int] = None
+            ) -> tuple[str, list[dict]]:
         """
         Search the message in the vector store.
 
         :param message: The customer question.
+        :param k_nearest_neighbors: The number of chunks to retrieve, the value given
+                                    to the constructor if not set.
         :return: Tuple of (context string, list of source metadata)
         """
         self._raise_if_no_index()
@@ -117,7 +296,11 @@ class SearchIndexManager:
             dimensions=self._dimensions,
             model=self._model
         ))['data'][0]['embedding']
-        vector_query = VectorizedQuery(vector=embedded_question, k_nearest_neighbors=5, fields="embedding")
+        vector_query = VectorizedQuery(
+            vector=embedded_question,
+            k_nearest_neighbors=k_nearest_neighbors or self._k_nearest_neighbors,
+            fields="embedding",
+            exhaustive=False)
         response = await self._get_client().search(
             vector_queries=[vector_query],
             select=['token', 'source_document', 'source_url', 'chunk_index', 'pageNumber'],
@@ -125,6 +308,7 @@ class SearchIndexManager:
 
         results = []
         sources = []
+        seen_sources = set()
         async for result in response:
             results.append(result['token'])
             # Collect source metadata
@@ -136,7 +320,9 @@ class SearchIndexManager:
                     'page_number': result.get('pageNumber', None)
                 }
                 # Avoid duplicate sources
-                if source_info not in sources:
+                source_key = tuple(source_info.values())
+                if source_key not in seen_sources:
+                    seen_sources.add(source_key)
                     sources.append(source_info)
 
         context = "\n------\n".join(results)
@@ -169,33 +355,122 @@ class SearchIndexManager:
 
         return len(embed_ids)
 
-    async def upload_documents(self, embeddings_file: str) -> None:
+    async def upload_documents(
+            self,
+            embeddings_file: str,
+            max_in_flight: int = MAX_CONCURRENT_UPLOADS
+            ) -> None:
         """
         Upload the embeggings file to index search.
 
-        :param embeddings_file: The embeddings file to upload.
+        :param embeddings_file: The embeddings file to upload, a CSV file or a Parquet file
+                                if the name ends with .parquet (requires pyarrow).
+        :param max_in_flight: The maximal number of indexing requests sent at the same time.
         """
         self._raise_if_no_index()
-        documents = []
-        index = 0
+        semaphore = asyncio.Semaphore(max_in_flight)
+        uploads = []
+
+        async def upload_and_release(documents: list[dict]) -> None:
+            try:
+                await self._upload_batch(documents)
+            finally:
+                semaphore.release()
+
+        async def upload_concurrently(documents: list[dict]) -> None:
+            # Waits for a free slot, so at most max_in_flight batches are held in memory
+            await semaphore.acquire()
+            uploads.append(asyncio.create_task(upload_and_release(documents)))
+
+        # Until a batch size was discovered, the first batches probe the candidate sizes
+        candidates = iter(() if self._upload_batch_size else SearchIndexManager.UPLOAD_BATCH_SIZES)
+        throughputs = {}
+        batch_size = next(candidates, self._upload_batch_size)
+        # Upload the rows in batches while reading, only one batch is kept in memory
+        batch = []
+        if embeddings_file.endswith('.parquet'):
+            rows = SearchIndexManager._read_embeddings_parquet(embeddings_file)
+        else:
+            rows = SearchIndexManager._read_embeddings_csv(embeddings_file)
+        for index, row in enumerate(rows):
+            doc = {
+                'embedId': str(index),
+                'token': row['token'],
+                'embedding': row['embedding']
+            }
+            # Add optional metadata fields if present
+            if 'source_document' in row:
+                doc['source_document'] = row['source_document']
+            if 'source_url' in row:
+                doc['source_url'] = row['source_url']
+            if 'chunk_index' in row:
+                doc['chunk_index'] = int(row['chunk_index'])
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                if self._upload_batch_size is None:
+                    # Probe batches are uploaded one at a time to measure their throughput
+                    throughputs[batch_size] = await self._upload_batch(batch)
+                    batch_size = next(candidates, None)
+                    if batch_size is None:
+                        self._upload_batch_size = max(throughputs, key=throughputs.get)
+                else:
+                    await upload_concurrently(batch)
+                batch = []
+                if self._upload_batch_size is not None:
+                    # The size may also have been reduced by a rejected upload
+                    batch_size = self._upload_batch_size
+        if batch:
+            await upload_concurrently(batch)
+        await asyncio.gather(*uploads)
+
+    @staticmethod
+    def _read_embeddings_csv(embeddings_file: str) -> Iterator[dict]:
+        """
+        Lazily read the rows of a CSV embeddings file.
+
+        :param embeddings_file: The CSV file written by build_embeddings_file.
+        :return: Iterator over the rows with the parsed embedding.
+        """
         with open(embeddings_file, newline='') as fp:
-            reader = csv.DictReader(fp)
-            for row in reader:
-                doc = {
-                    'embedId': str(index),
-                    'token': row['token'],
-                    'embedding': json.loads(row['embedding'])
-                }
-                # Add optional metadata fields if present
-                if 'source_document' in row:
-                    doc['source_document'] = row['source_document']
-                if 'source_url' in row:
-                    doc['source_url'] = row['source_url']
-                if 'chunk_index' in row:
-                    doc['chunk_index'] = int(row['chunk_index'])
-                documents.append(doc)
-                index += 1
-        await self._get_client().upload_documents(documents)
+            for row in csv.DictReader(fp):
+                row['embedding'] = orjson.loads(row['embedding'])
+                yield row
+
+    @staticmethod
+    def _read_embeddings_parquet(embeddings_file: str) -> Iterator[dict]:
+        """
+        Lazily read the rows of a Parquet embeddings file, one record batch at a time.
+
+        pyarrow is imported here, it is only needed to build the index from Parquet files.
+
+        :param embeddings_file: The Parquet file written by build_embeddings_file.
+        :return: Iterator over the rows.
+        """
+        import pyarrow.parquet as pq
+
+        for record_batch in pq.ParquetFile(embeddings_file).iter_batches():
+            yield from record_batch.to_pylist()
+
+    async def _upload_batch(self, documents: list[dict]) -> float:
+        """
+        Upload the documents in one request, splitting them in halves if the request is too large.
+
+        :param documents: The documents to upload.
+        :return: The upload throughput in documents per second.
+        """
+        start = time.perf_counter()
+        try:
+            await self._get_client().upload_documents(documents)
+        except HttpResponseError as e:
+            # Throttling (503) is retried by the client, only too large requests are handled here
+            if e.status_code != 413 or len(documents) < 2:
+                raise
+            half = len(documents) // 2
+            if self._upload_batch_size is not None:
+                self._upload_batch_size = min(self._upload_batch_size, half)
+            await self._upload_batch(documents[:half])
+            await self._upload_batch(documents[half:])
+        return len(documents) / (time.perf_counter() - start)
 
     async def upload_document_chunks(
         self,
@@ -216,33 +491,24 @@ class SearchIndexManager:
         # Keys can only contain letters, digits, underscore (_), dash (-), or equal sign (=)
         safe_document_name = self._sanitize_key(source_document)
 
-        documents = []
-        for chunk_index, chunk_data in enumerate(chunks):
-            chunk_text = chunk_data['text']
-            page_number = chunk_data.get('page_number', None)
-
-            # Generate embedding for chunk
-            embedding_response = await self._embeddings_client.embed(
-                input=chunk_text,
-                dimensions=self._dimensions,
-                model=self._model
-            )
-            embedding = embedding_response['data'][0]['embedding']
+        # Generate the embeddings of all chunks in batched requests
+        embeddings = await self._embed_texts_cached([chunk_data['text'] for chunk_data in chunks])
 
+        documents = []
+        for chunk_index, (chunk_data, embedding) in enumerate(zip(chunks, embeddings)):
             # Create document with metadata
-            doc = {
+            documents.append({
                 'embedId': f"{safe_document_name}_{chunk_index}",
-                'token': chunk_text,
+                'token': chunk_data['text'],
                 'embedding': embedding,
                 'source_document': source_document,
                 'source_url': source_url,
                 'chunk_index': chunk_index,
-                'pageNumber': page_number
-            }
-            documents.append(doc)
+                'pageNumber': chunk_data.get('page_number', None)
+            })
 
         # Upload all chunks at once
-        await self._get_client().upload_documents(documents)
+        await self._upload_batch(documents)
 
     async def is_index_empty(self) -> bool:
         """
@@ -271,7 +537,7 @@ class SearchIndexManager:
     async def delete_index(self):
         """Delete the index from vector store."""
         self._raise_if_no_index()
-        async with SearchIndexClient(endpoint=self._endpoint, credential=self._credential) as ix_client:
+        async with self._get_index_client() as ix_client:
             await ix_client.delete_index(self._index.name)
         self._index = None
 
@@ -309,27 +575,32 @@ class SearchIndexManager:
         """
         vector_index_dimensions = self._check_dimensions(vector_index_dimensions)
         if self._index is None:
-            self._index = await SearchIndexManager.get_or_create_index(
-                self._endpoint,
-                self._credential,
-                self._index_name,
-                vector_index_dimensions)
+            async with self._get_index_client() as ix_client:
+                self._index = await SearchIndexManager.get_or_create_index(
+                    self._endpoint,
+                    self._credential,
+                    self._index_name,
+                    vector_index_dimensions,
+                    self._hnsw_parameters,
+                    ix_client)
 
     @staticmethod
     async def index_exists(
         endpoint: str,
         credential: AsyncTokenCredential,
-        index_name: str) -> bool:
+        index_name: str,
+        ix_client: Optional[SearchIndexClient] = None) -> bool:
         """
         Check if index exists.
 
         :param endpoint: The search end point to be used.
         :param credential: The credential to be used for the search.
         :param index_name: The name of an index to get or to create.
+        :param ix_client: An open index client to reuse, a new one is opened if not set.
         :return: True if index already exists.
         """
         exists = False
-        async with SearchIndexClient(endpoint=endpoint, credential=credential) as ix_client:
+        async with _open_index_client(endpoint, credential, ix_client) as ix_client:
             try:
                 await ix_client.get_index(index_name)
                 exists = True
@@ -343,6 +614,8 @@ class SearchIndexManager:
             credential: AsyncTokenCredential,
             index_name: str,
             dimensions: int,
+            hnsw_parameters: Optional[HnswParameters] = None,
+            ix_client: Optional[SearchIndexClient] = None,
         ) -> SearchIndex:
         """
         Get o create the search index.
@@ -352,21 +625,26 @@ class SearchIndexManager:
         :param credential: The credential to be used for the search.
         :param index_name: The name of an index to get or to create.
         :param dimensions: The number of dimensions in the embedding.
+        :param hnsw_parameters: The HNSW parameters of a new index, DEFAULT_HNSW_PARAMETERS if not set.
+        :param ix_client: An open index client to reuse, a new one is opened if not set.
         :return: the search index object.
         """
         index = None
-        async with SearchIndexClient(endpoint=endpoint, credential=credential) as ix_client:
+        # The lookup and the creation share one client and its connection
+        async with _open_index_client(endpoint, credential, ix_client) as ix_client:
             try:
                 index = await ix_client.get_index(index_name)
             except ResourceNotFoundError:
                 pass
-        if index is None:
-            index = await SearchIndexManager._index_create(
-                endpoint=endpoint,
-                credential=credential,
-                index_name=index_name,
-                dimensions=dimensions
-            )
+            if index is None:
+                index = await SearchIndexManager._index_create(
+                    endpoint=endpoint,
+                    credential=credential,
+                    index_name=index_name,
+                    dimensions=dimensions,
+                    hnsw_parameters=hnsw_parameters,
+                    ix_client=ix_client
+                )
         return index
 
     async def create_index(
@@ -388,12 +666,15 @@ class SearchIndexManager:
         """
         vector_index_dimensions = self._check_dimensions(vector_index_dimensions)
         try:
-            self._index = await SearchIndexManager._index_create(
-                endpoint=self._endpoint,
-                credential=self._credential,
-                index_name=self._index_name,
-                dimensions=vector_index_dimensions
-            )
+            async with self._get_index_client() as ix_client:
+                self._index = await SearchIndexManager._index_create(
+                    endpoint=self._endpoint,
+                    credential=self._credential,
+                    index_name=self._index_name,
+                    dimensions=vector_index_dimensions,
+                    hnsw_parameters=self._hnsw_parameters,
+                    ix_client=ix_client
+                )
             return True
         except HttpResponseError:
             return False
@@ -404,9 +685,11 @@ class SearchIndexManager:
         endpoint: str,
         credential: AsyncTokenCredential,
         index_name: str,
-        dimensions: int) -> SearchIndex:
-        """Create the index."""
-        async with SearchIndexClient(endpoint=endpoint, credential=credential) as ix_client:
+        dimensions: int,
+        hnsw_parameters: Optional[HnswParameters] = None,
+        ix_client: Optional[SearchIndexClient] = None) -> SearchIndex:
+        """Create the index, reusing ix_client if given."""
+        async with _open_index_client(endpoint, credential, ix_client) as ix_client:
             fields = [
                 SimpleField(name="embedId", type=SearchFieldDataType.String, key=True),
                 SearchField(
@@ -414,7 +697,11 @@ class SearchIndexManager:
                     type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
                     vector_search_dimensions=dimensions,
                     searchable=True,
-                    vector_search_profile_name="embedding_config"
+                    vector_search_profile_name="embedding_config",
+                    # The vector is only used for ranking, it is never returned in search results
+                    # and does not need to be stored for retrieval.
+                    hidden=True,
+                    stored=False
                 ),
                 SimpleField(name="token", type=SearchFieldDataType.String, hidden=False),
                 SimpleField(name="source_document", type=SearchFieldDataType.String, hidden=False, filterable=True),
@@ -424,8 +711,16 @@ class SearchIndexManager:
             ]
             vector_search = VectorSearch(
                 profiles=[VectorSearchProfile(name="embedding_config",
-                                              algorithm_configuration_name="embed-algorithms-config")],
-                algorithms=[HnswAlgorithmConfiguration(name="embed-algorithms-config")],
+                                              algorithm_configuration_name="embed-algorithms-config",
+                                              compression_name="embed-compression-config")],
+                algorithms=[HnswAlgorithmConfiguration(
+                    name="embed-algorithms-config",
+                    parameters=hnsw_parameters or SearchIndexManager.DEFAULT_HNSW_PARAMETERS)],
+                # The graph is built and searched on int8 codes of the vectors, the candidates
+                # are rescored with the full precision vectors.
+                compressions=[ScalarQuantizationCompression(
+                    compression_name="embed-compression-config",
+                    parameters=ScalarQuantizationParameters(quantized_data_type="int8"))],
             )
             search_index = SearchIndex(name=index_name, fields=fields, vector_search=vector_search)
             new_index = await ix_client.create_index(search_index)
@@ -436,7 +731,8 @@ class SearchIndexManager:
             self,
             input_directory: str,
             output_file: str,
-            sentences_per_embedding: int=4
+            sentences_per_embedding: int=4,
+            max_in_flight: int=MAX_CONCURRENT_EMBEDDINGS
             ) -> None:
         """
         In this method we do lazy loading of nltk and download the needed data set to split
@@ -447,51 +743,154 @@ class SearchIndexManager:
         :param dimensions: The number of dimensions in the embeddings. Must be the same as
                the one used for SearchIndexManager creation.
         :param input_directory: The directory with the embedding files.
-        :param output_file: The file csv file to store embeddings.
+        :param output_file: The file csv file to store embeddings. If the name ends with .parquet,
+               a Parquet file with float32 embeddings is written instead (requires pyarrow).
         :param embeddings_client: The embedding client, used to create embeddings. 
                 Must be the same as the one used for SearchIndexManager creation.
         :param sentences_per_embedding: The number of sentences used to build embedding.
+        :param max_in_flight: The maximal number of embeddings requests sent at the same time.
         :param model: The embedding model to be used.
         """
-        import nltk
-        nltk.download('punkt')
-        
-        from nltk.tokenize import sent_tokenize
-        # Split the data to sentence tokens.
-        sentence_tokens = []
-        globs = glob.glob(input_directory + '/*.md', recursive=True)
-        index = 0
-        for fle in globs:
-            with open(fle) as f:
-                for line in f:
-                    line = line.strip()
-                    # Skip non informative lines.
-                    if len(line) < SearchIndexManager.MIN_LINE_LENGTH or len(set(line)) < SearchIndexManager.MIN_DIFF_CHARACTERS_IN_LINE:
-                        continue
-                    for sentence in sent_tokenize(line):
-                        if index % sentences_per_embedding == 0:
-                            sentence_tokens.append(sentence)
-                        else:
-                            sentence_tokens[-1] += ' '
-                            sentence_tokens[-1] += sentence
-                        index += 1
-        
-        
-        # For each token build the embedding, which will be used in the search.
-        batch_size = 2000
-        with open(output_file, 'w') as fp:
-            writer = csv.DictWriter(fp, fieldnames=['token', 'embedding'])
-            writer.writeheader()
-            for i in range(0, len(sentence_tokens), batch_size):
-                emedding = (await self._embeddings_client.embed(
-                    input=sentence_tokens[i:i+min(batch_size, len(sentence_tokens))],
-                    dimensions=self._dimensions,
-                    model=self._model
-                ))["data"]
-                for token, float_data in zip(sentence_tokens, emedding):
-                    writer.writerow({'token': token, 'embedding': json.dumps(float_data['embedding'])})
+        # Downloads the Punkt model if needed before the worker processes start, which only load it
+        get_punkt_tokenizer()
+
+        files = list(SearchIndexManager._iter_markdown_files(input_directory))
+
+        # Embedding requests run while the next files are tokenized, the batches in flight
+        # are written in their original order as soon as the oldest one is done.
+        batch_size = SearchIndexManager.EMBEDDING_BATCH_SIZE
+        in_flight = collections.deque()
+        with contextlib.ExitStack() as stack:
+            pool = stack.enter_context(ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn')))
+            write_rows = SearchIndexManager._open_embeddings_writer(output_file, stack)
+
+            async def write_oldest() -> None:
+                tokens, embedding_task = in_flight.popleft()
+                write_rows(tokens, await embedding_task)
+
+            async def embed(batch: list[str]) -> None:
+                in_flight.append((batch, asyncio.create_task(self._embed_batch(batch))))
+                if len(in_flight) >= max_in_flight:
+                    await write_oldest()
+
+            try:
+                sentences = []
+                batch = []
+                async for file_sentences in SearchIndexManager._tokenize_files(files, pool):
+                    for sentence in file_sentences:
+                        sentences.append(sentence)
+                        if len(sentences) == sentences_per_embedding:
+                            batch.append(' '.join(sentences))
+                            sentences = []
+                            if len(batch) == batch_size:
+                                await embed(batch)
+                                batch = []
+                if sentences:
+                    batch.append(' '.join(sentences))
+                if batch:
+                    await embed(batch)
+                while in_flight:
+                    await write_oldest()
+            finally:
+                for _, embedding_task in in_flight:
+                    embedding_task.cancel()
+
+    @staticmethod
+    def _has_distinct_characters(line: str, count: int) -> bool:
+        """
+        Return True if the line has at least count different characters.
+
+        Informative lines almost always reach the count within their first characters,
+        so only a short prefix is hashed before falling back to the whole line.
+
+        :param line: The line to check.
+        :param count: The required number of different characters.
+        :return: True if the line has at least count different characters.
+        """
+        return len(set(line[:32])) >= count or len(set(line)) >= count
+
+    @staticmethod
+    def _iter_markdown_files(directory: str) -> Iterator[str]:
+        """
+        Recursively find the markdown files in the directory, in a stable order.
+
+        :param directory: The directory to search, nothing is found if it does not exist.
+        :return: Iterator over the paths of the .md files.
+        """
+        if not os.path.isdir(directory):
+            return
+        with os.scandir(directory) as it:
+            # DirEntry caches the file type read with the directory listing
+            entries = sorted(it, key=lambda entry: entry.name)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from SearchIndexManager._iter_markdown_files(entry.path)
+            elif entry.name.endswith('.md') and entry.is_file():
+                yield entry.path
+
+    @staticmethod
+    def _open_embeddings_writer(
+            output_file: str,
+            stack: contextlib.ExitStack) -> Callable[[list[str], list[list[float]]], None]:
+        """
+        Open the embeddings file and return a function appending rows to it.
+
+        :param output_file: The file to write, Parquet if the name ends with .parquet, CSV otherwise.
+        :param stack: The exit stack closing the file.
+        :return: Function writing the tokens with their embeddings.
+        """
+        if output_file.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            parquet_writer = None
+
+            def write_parquet_rows(tokens: list[str], embeddings: list[list[float]]) -> None:
+                nonlocal parquet_writer
+                values = pa.array([value for embedding in embeddings for value in embedding], pa.float32())
+                table = pa.Table.from_arrays(
+                    [pa.array(tokens, pa.string()), pa.FixedSizeListArray.from_arrays(values, len(embeddings[0]))],
+                    names=['token', 'embedding'])
+                if parquet_writer is None:
+                    parquet_writer = stack.enter_context(pq.ParquetWriter(output_file, table.schema))
+                parquet_writer.write_table(table)
+
+            return write_parquet_rows
+
+        writer = csv.DictWriter(stack.enter_context(open(output_file, 'w')), fieldnames=['token', 'embedding'])
+        writer.writeheader()
+
+        def write_csv_rows(tokens: list[str], embeddings: list[list[float]]) -> None:
+            for token, embedding in zip(tokens, embeddings):
+                writer.writerow({'token': token, 'embedding': orjson.dumps(embedding).decode()})
+
+        return write_csv_rows
+
+    @staticmethod
+    async def _tokenize_files(files: list[str], pool: ProcessPoolExecutor) -> AsyncIterator[list[str]]:
+        """
+        Split the files into sentences in the worker processes of the pool.
+
+        A few files more than there are workers are tokenized ahead of the consumer.
+
+        :param files: The markdown files to read.
+        :param pool: The process pool to run the tokenization in.
+        :return: Async iterator over the sentences of each file, in the order of the files.
+        """
+        loop = asyncio.get_running_loop()
+        ahead = 2 * (os.cpu_count() or 1)
+        pending = collections.deque()
+        for fle in files:
+            pending.append(loop.run_in_executor(pool, _read_sentences, fle))
+            if len(pending) >= ahead:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
 
     async def close(self):
         """Close the closeable resources, associated with SearchIndexManager."""
         if self._client:
             await self._client.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
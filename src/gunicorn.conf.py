@@ -29,15 +29,18 @@ async def create_index_maybe():
                 model=os.getenv('AZURE_AI_EMBED_DEPLOYMENT_NAME'),
                 embeddings_client=None
             )
-            # If another application instance already have created the index,
-            # do not upload the documents.
-            if await search_mgr.create_index(
-              vector_index_dimensions=int(
-                  os.getenv('AZURE_AI_EMBED_DIMENSIONS'))):
-                embeddings_path = os.path.join(
-                    os.path.dirname(__file__), 'api', 'data', 'embeddings.csv')
-                assert embeddings_path, f'File {embeddings_path} not found.'
-                await search_mgr.upload_documents(embeddings_path)
+            try:
+                # If another application instance already have created the index,
+                # do not upload the documents.
+                if await search_mgr.create_index(
+                  vector_index_dimensions=int(
+                      os.getenv('AZURE_AI_EMBED_DIMENSIONS'))):
+                    embeddings_path = os.path.join(
+                        os.path.dirname(__file__), 'api', 'data', 'embeddings.csv')
+                    assert embeddings_path, f'File {embeddings_path} not found.'
+                    await search_mgr.upload_documents(embeddings_path)
+            finally:
+                # Close the HTTP session on every node, not only the one that created the index
                 await search_mgr.close()
 
 
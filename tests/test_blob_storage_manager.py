@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+# See LICENSE file in the project root for full license information.
+import hashlib
+import io
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from api.blob_storage_manager import BlobStorageManager
+
+
+class TestBlobStorageManager(unittest.IsolatedAsyncioTestCase):
+    """Tests for the content hash deduplication of uploads."""
+
+    CONTENT = b'%PDF-1.7 document content'
+    CONTENT_HASH = hashlib.blake2b(CONTENT, digest_size=16).hexdigest()
+    BLOB_NAME = f'{CONTENT_HASH}_Bericht_Maerz.pdf'
+
+    async def asyncSetUp(self) -> None:
+        self.manager = BlobStorageManager(
+            blob_endpoint='https://account.blob.core.windows.net',
+            credential=Mock())
+        self.blob_client = AsyncMock()
+        self.blob_client.url = f'https://account.blob.core.windows.net/documents/{self.BLOB_NAME}'
+        self.manager._container_client = Mock()
+        self.manager._container_client.get_blob_client.return_value = self.blob_client
+
+    async def asyncTearDown(self) -> None:
+        await self.manager.close()
+
+    async def test_upload_new_blob(self):
+        """Test that a new document is uploaded under its content hash."""
+        self.blob_client.get_blob_properties.side_effect = ResourceNotFoundError("Mock")
+        blob_url, created = await self.manager.upload_document(
+            filename='Bericht_März.pdf',
+            file_content=self.CONTENT,
+            metadata={'original_filename': 'Bericht_M%C3%A4rz.pdf'})
+        self.assertEqual(blob_url, self.blob_client.url)
+        self.assertTrue(created)
+        self.manager._container_client.get_blob_client.assert_called_once_with(self.BLOB_NAME)
+        self.blob_client.upload_blob.assert_awaited_once()
+        kwargs = self.blob_client.upload_blob.await_args.kwargs
+        self.assertEqual(kwargs['length'], len(self.CONTENT))
+        self.assertEqual(kwargs['metadata'], {
+            'original_filename': 'Bericht_M%C3%A4rz.pdf',
+            'content_hash': self.CONTENT_HASH})
+
+    async def test_skip_identical_blob(self):
+        """Test that an identical stored blob is reused without uploading."""
+        self.blob_client.get_blob_properties.return_value = Mock(
+            metadata={'content_hash': self.CONTENT_HASH})
+        blob_url, created = await self.manager.upload_document(
+            filename='Bericht_März.pdf', file_content=self.CONTENT)
+        self.assertEqual(blob_url, self.blob_client.url)
+        self.assertFalse(created)
+        self.blob_client.upload_blob.assert_not_awaited()
+
+    async def test_upload_over_blob_without_hash(self):
+        """Test that a blob without a matching content hash is overwritten."""
+        self.blob_client.get_blob_properties.return_value = Mock(metadata={})
+        _, created = await self.manager.upload_document(
+            filename='Bericht_März.pdf', file_content=self.CONTENT)
+        self.assertTrue(created)
+        self.assertTrue(self.blob_client.upload_blob.await_args.kwargs['overwrite'])
+
+    async def test_upload_stream(self):
+        """Test that a stream is hashed like bytes and uploaded from its start."""
+        self.blob_client.get_blob_properties.side_effect = ResourceNotFoundError("Mock")
+        stream = io.BytesIO(self.CONTENT)
+        _, created = await self.manager.upload_document(
+            filename='Bericht_März.pdf', file_content=stream)
+        self.assertTrue(created)
+        self.manager._container_client.get_blob_client.assert_called_once_with(self.BLOB_NAME)
+        args = self.blob_client.upload_blob.await_args
+        self.assertIs(args.args[0], stream)
+        self.assertEqual(args.kwargs['length'], len(self.CONTENT))
+        self.assertEqual(stream.tell(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
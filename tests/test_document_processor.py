@@ -0,0 +1,88 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+# See LICENSE file in the project root for full license information.
+import io
+import unittest
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from api.document_processor import DocumentProcessor, PageMap
+
+
+class TestPageMap(unittest.TestCase):
+    """Tests for the page offset lookup."""
+
+    def _get_page_map(self):
+        """Return a map of pages 1, 3 and 4 starting at 0, 10 and 25."""
+        page_map = PageMap()
+        page_map.add_page(0, 1)
+        page_map.add_page(10, 3)
+        page_map.add_page(25, 4)
+        return page_map
+
+    def test_page_for(self):
+        """Test that a position resolves to the last page starting at or before it."""
+        page_map = self._get_page_map()
+        self.assertEqual(page_map.page_for(0), 1)
+        self.assertEqual(page_map.page_for(9), 1)
+        self.assertEqual(page_map.page_for(10), 3)
+        self.assertEqual(page_map.page_for(24), 3)
+        self.assertEqual(page_map.page_for(25), 4)
+        self.assertEqual(page_map.page_for(10000), 4)
+
+    def test_page_for_before_first_page(self):
+        """Test positions before the first page and lookups in an empty map."""
+        page_map = PageMap()
+        self.assertFalse(page_map)
+        self.assertIsNone(page_map.page_for(0))
+        self.assertEqual(page_map.pages_for([0, 5]), [None, None])
+        page_map.add_page(5, 2)
+        self.assertTrue(page_map)
+        self.assertIsNone(page_map.page_for(4))
+        self.assertEqual(page_map.page_for(5), 2)
+
+    def test_pages_for_matches_page_for(self):
+        """Test that the single pass lookup agrees with the binary search."""
+        page_map = self._get_page_map()
+        positions = [0, 3, 9, 10, 10, 11, 24, 25, 26, 100]
+        self.assertEqual(
+            page_map.pages_for(positions),
+            [page_map.page_for(pos) for pos in positions])
+
+
+class TestDocumentProcessor(unittest.TestCase):
+    """Tests for the document text extraction."""
+
+    def test_read_docx_keeps_tabs_breaks_and_hyperlinks(self):
+        """Test that DOCX paragraphs are read like python-docx's paragraph.text."""
+        doc = Document()
+        para = doc.add_paragraph('Name:')
+        para.add_run().add_tab()
+        para.add_run('Value')
+        para = doc.add_paragraph('Line one')
+        para.runs[0].add_break()
+        para.add_run('Line two')
+        doc.add_paragraph('   ')
+        para = doc.add_paragraph('See ')
+        hyperlink = OxmlElement('w:hyperlink')
+        run = OxmlElement('w:r')
+        text = OxmlElement('w:t')
+        text.text = 'the docs'
+        run.append(text)
+        hyperlink.append(run)
+        para._p.append(hyperlink)
+        para.add_run(' for details.')
+        buffer = io.BytesIO()
+        doc.save(buffer)
+
+        text, page_map = DocumentProcessor._read_docx(buffer.getvalue())
+
+        self.assertEqual(
+            text, 'Name:\tValue\n\nLine one\nLine two\n\nSee the docs for details.')
+        self.assertFalse(page_map)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+# See LICENSE file in the project root for full license information.
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+from foundry_tools.rate_limiter import RateLimiter, get_rate_limiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Tests for the token bucket rate limiter."""
+
+    def test_burst_up_to_capacity(self):
+        """Test that a full bucket allows max_requests requests without waiting."""
+        limiter = RateLimiter(max_requests=5, time_window=60)
+        start = time.monotonic()
+        for _ in range(5):
+            self.assertTrue(limiter.acquire())
+        self.assertLess(time.monotonic() - start, 0.05)
+        self.assertLess(limiter.tokens, 1)
+
+    def test_wait_for_next_token(self):
+        """Test that an empty bucket waits only until the next token is refilled."""
+        # 2 tokens per 0.2 seconds, a new token every 0.1 seconds
+        limiter = RateLimiter(max_requests=2, time_window=0.2)
+        limiter.acquire()
+        limiter.acquire()
+        start = time.monotonic()
+        with patch('builtins.print'):
+            limiter.acquire()
+        self.assertAlmostEqual(time.monotonic() - start, 0.1, delta=0.05)
+
+    def test_refill_is_capped(self):
+        """Test that an idle bucket does not refill beyond its capacity."""
+        limiter = RateLimiter(max_requests=3, time_window=60)
+        limiter.acquire()
+        limiter.last_refill -= 3600
+        limiter.acquire()
+        self.assertAlmostEqual(limiter.tokens, 2, places=3)
+
+    def test_acquire_permits(self):
+        """Test that several permits are taken at once."""
+        limiter = RateLimiter(max_requests=5, time_window=60)
+        limiter.acquire(permits=4)
+        self.assertAlmostEqual(limiter.tokens, 1, places=3)
+
+    def test_permits_above_capacity(self):
+        """Test that permits which can never be granted raise instead of waiting forever."""
+        limiter = RateLimiter(max_requests=2, time_window=60)
+        with self.assertRaises(ValueError):
+            limiter.acquire(permits=3)
+        with self.assertRaises(ValueError):
+            asyncio.run(limiter.acquire_async(permits=3))
+        self.assertEqual(limiter.tokens, 2)
+
+    def test_acquire_async(self):
+        """Test that async callers share the bucket and wait without blocking the loop."""
+        limiter = RateLimiter(max_requests=3, time_window=0.3)
+        ticks = []
+
+        async def tick():
+            while len(ticks) < 100:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def acquire_all():
+            ticker = asyncio.create_task(tick())
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.acquire_async() for _ in range(4)))
+            elapsed = time.monotonic() - start
+            ticker.cancel()
+            return elapsed
+
+        elapsed = asyncio.run(acquire_all())
+        # The fourth caller waits for one token, 0.1 seconds at 10 tokens per second
+        self.assertAlmostEqual(elapsed, 0.1, delta=0.05)
+        self.assertGreater(len(ticks), 3)
+
+    def test_get_rate_limiter_is_shared(self):
+        """Test that every service gets one shared limiter."""
+        limiter = get_rate_limiter('test_service', max_requests=7)
+        self.assertIs(get_rate_limiter('test_service', max_requests=7), limiter)
+        self.assertEqual(limiter.max_requests, 7)
+        self.assertIsNot(get_rate_limiter('other_test_service'), limiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
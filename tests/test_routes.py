@@ -0,0 +1,140 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+# See LICENSE file in the project root for full license information.
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import orjson
+from fastapi import UploadFile
+
+from api import routes
+from api.document_processor import DocumentProcessor
+from api.util import ChatRequest, Message
+
+
+def _delta(content):
+    """Return a streamed completion event carrying one delta."""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class TestChatStream(unittest.IsolatedAsyncioTestCase):
+    """Tests for the coalescing of streamed deltas into SSE frames."""
+
+    async def _get_frames(self, completion):
+        """Return an iterator over the decoded SSE frames of a chat request."""
+        chat_client = AsyncMock()
+        chat_client.complete.return_value = completion
+        response = await routes.chat_stream_handler(
+            ChatRequest(messages=[Message(role='user', content='Hello')]),
+            chat_client, 'gpt-4o-mini', None, None)
+        async for frame in response.body_iterator:
+            self.assertTrue(frame.startswith(b'data: ') and frame.endswith(b'\n\n'))
+            yield orjson.loads(frame[len(b'data: '):])
+
+    async def test_queued_deltas_are_coalesced(self):
+        """Test that deltas queued at once are sent in frames of at most STREAM_FLUSH_TOKENS."""
+        tokens = [f'{i} ' for i in range(20)]
+
+        async def completion():
+            for token in tokens:
+                yield _delta(token)
+
+        frames = [frame async for frame in self._get_frames(completion())]
+        messages = [frame['content'] for frame in frames if frame['type'] == 'message']
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(messages[0], ''.join(tokens[:routes.STREAM_FLUSH_TOKENS]))
+        self.assertEqual(''.join(messages), ''.join(tokens))
+        self.assertEqual(frames[-2], {
+            'content': ''.join(tokens), 'type': 'completed_message', 'sources': []})
+        self.assertEqual(frames[-1], {'type': 'stream_end'})
+
+    async def test_deltas_are_not_held_back(self):
+        """Test that buffered deltas are sent while the model pauses."""
+        resume = asyncio.Event()
+
+        async def completion():
+            for token in ('Hel', 'lo', ' '):
+                yield _delta(token)
+            await resume.wait()
+            yield _delta('world')
+
+        frames = self._get_frames(completion())
+        first = await asyncio.wait_for(frames.__anext__(), timeout=1)
+        self.assertEqual(first, {'type': 'message', 'content': 'Hello '})
+        resume.set()
+        rest = [frame async for frame in frames]
+        self.assertEqual(rest[0], {'type': 'message', 'content': 'world'})
+        self.assertEqual(rest[1]['content'], 'Hello world')
+
+
+class TestUploadDocument(unittest.IsolatedAsyncioTestCase):
+    """Tests for the blob cleanup of failed uploads."""
+
+    BLOB_URL = 'https://account.blob.core.windows.net/documents/0123_notes.txt'
+
+    def _get_upload(self, content):
+        """Return an upload of a text file spooled like FastAPI does."""
+        spooled = tempfile.SpooledTemporaryFile()
+        spooled.write(content)
+        spooled.seek(0)
+        return UploadFile(file=spooled, filename='notes.txt')
+
+    def _get_blob_storage_manager(self, created):
+        blob_storage_manager = AsyncMock()
+        blob_storage_manager.upload_document.return_value = (self.BLOB_URL, created)
+        return blob_storage_manager
+
+    async def test_empty_text_deletes_created_blob(self):
+        """Test that a blob created by the failed upload is deleted."""
+        blob_storage_manager = self._get_blob_storage_manager(created=True)
+        response = await routes.upload_document(
+            self._get_upload(b'   '), AsyncMock(), blob_storage_manager)
+        self.assertEqual(response.status_code, 400)
+        blob_storage_manager.delete_document.assert_awaited_once_with('0123_notes.txt')
+
+    async def test_empty_text_keeps_existing_blob(self):
+        """Test that an identical blob stored by an earlier upload is kept."""
+        blob_storage_manager = self._get_blob_storage_manager(created=False)
+        response = await routes.upload_document(
+            self._get_upload(b'   '), AsyncMock(), blob_storage_manager)
+        self.assertEqual(response.status_code, 400)
+        blob_storage_manager.delete_document.assert_not_awaited()
+
+    async def test_failed_extraction_keeps_existing_blob(self):
+        """Test that a failed extraction does not delete a blob it did not create."""
+        blob_storage_manager = self._get_blob_storage_manager(created=False)
+
+        async def extract_text(file_content, filename):
+            await asyncio.sleep(0.01)
+            raise ValueError('Failed to extract text')
+
+        with patch.object(DocumentProcessor, 'extract_text', extract_text):
+            response = await routes.upload_document(
+                self._get_upload(b'Some text.'), AsyncMock(), blob_storage_manager)
+        self.assertEqual(response.status_code, 400)
+        blob_storage_manager.delete_document.assert_not_awaited()
+
+    async def test_disconnect_deletes_created_blob(self):
+        """Test that a client disconnect removes the blob the upload created."""
+        blob_storage_manager = self._get_blob_storage_manager(created=True)
+
+        async def extract_text(file_content, filename):
+            await asyncio.sleep(10)
+
+        with patch.object(DocumentProcessor, 'extract_text', extract_text):
+            task = asyncio.create_task(routes.upload_document(
+                self._get_upload(b'Some text.'), AsyncMock(), blob_storage_manager))
+            while not blob_storage_manager.upload_document.await_count:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        blob_storage_manager.delete_document.assert_awaited_once_with('0123_notes.txt')
+
+
+if __name__ == '__main__':
+    unittest.main()
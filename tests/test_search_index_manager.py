@@ -9,7 +9,7 @@ from unittest.mock import AsyncMock, Mock, patch
 from azure.identity.aio import DefaultAzureCredential
 
 from util import ChatRequest, Message
-from search_index_manager import SearchIndexManager
+from search_index_manager import SearchIndexManager, _read_sentences
 from azure.ai.projects.aio import AIProjectClient
 from azure.core.exceptions import ResourceNotFoundError, HttpResponseError
 import tempfile
@@ -300,6 +300,24 @@ class TestSearchIndexManager(unittest.IsolatedAsyncioTestCase):
                             index, index])
                     index += 1
 
+    def test_read_sentences(self):
+        """Test that only informative lines are split into sentences."""
+        tokenizer = Mock()
+        tokenizer.tokenize.side_effect = lambda line: line.split('. ')
+        with tempfile.TemporaryDirectory() as d:
+            input_file = os.path.join(d, 'input.md')
+            with open(input_file, 'w', encoding='utf-8') as f:
+                f.write('First sentence. Second sentence\n')
+                f.write('aaaaaaaaaa\n')
+                f.write('abc\n')
+                f.write('\n')
+                f.write('  Third sentence  \n')
+            with patch('search_index_manager.get_punkt_tokenizer',
+                       return_value=tokenizer):
+                sentences = _read_sentences(input_file)
+        self.assertListEqual(
+            sentences, ['First sentence', 'Second sentence', 'Third sentence'])
+
     @unittest.skip("Only for live tests.")
     async def test_build_embeddings_file(self):
         """Use this test to build the new embeddings file in the data directory."""
@@ -0,0 +1,105 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license.
+# See LICENSE file in the project root for full license information.
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from foundry_tools.vector_db import VectorDB
+
+
+def _result(key, status_code):
+    """Return the indexing result of a single document."""
+    return SimpleNamespace(
+        key=key, succeeded=status_code < 300, status_code=status_code, error_message='Mock')
+
+
+class TestDeleteDocuments(unittest.TestCase):
+    """Tests for the retries of VectorDB.delete_documents."""
+
+    def setUp(self) -> None:
+        # Skip __init__, it resolves endpoints and credentials
+        self.vector_db = VectorDB.__new__(VectorDB)
+        self.vector_db._client = Mock()
+        self.vector_db.rate_limiter = Mock()
+        sleep_patcher = patch('foundry_tools.vector_db.time.sleep')
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def _deleted_keys(self):
+        """Return the keys sent with every delete request."""
+        return [
+            [document['chunk_id'] for document in call.kwargs['documents']]
+            for call in self.vector_db.client.delete_documents.call_args_list]
+
+    def test_delete_all(self):
+        """Test that a successful batch is sent once without waiting."""
+        self.vector_db.client.delete_documents.return_value = [_result('a', 200), _result('b', 200)]
+        self.assertTrue(self.vector_db.delete_documents(['a', 'b']))
+        self.assertEqual(self._deleted_keys(), [['a', 'b']])
+        self.sleep.assert_not_called()
+
+    def test_retry_only_throttled_documents(self):
+        """Test that only throttled documents are retried and permanent failures are kept."""
+        self.vector_db.client.delete_documents.side_effect = [
+            [_result('a', 200), _result('b', 429), _result('c', 400), _result('d', 503)],
+            [_result('b', 200), _result('d', 503)],
+            [_result('d', 200)],
+        ]
+        self.assertFalse(self.vector_db.delete_documents(['a', 'b', 'c', 'd']))
+        self.assertEqual(self._deleted_keys(), [['a', 'b', 'c', 'd'], ['b', 'd'], ['d']])
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [2, 4])
+        self.assertEqual(self.vector_db.rate_limiter.acquire.call_count, 3)
+
+    def test_retry_throttled_documents(self):
+        """Test that throttled documents which succeed later count as deleted."""
+        self.vector_db.client.delete_documents.side_effect = [
+            [_result('a', 200), _result('b', 429)],
+            [_result('b', 200)],
+        ]
+        self.assertTrue(self.vector_db.delete_documents(['a', 'b']))
+
+    def test_give_up_after_max_retries(self):
+        """Test that retries stop after max_retries."""
+        self.vector_db.client.delete_documents.return_value = [_result('a', 503)]
+        self.assertFalse(self.vector_db.delete_documents(['a'], max_retries=2))
+        self.assertEqual(self._deleted_keys(), [['a'], ['a'], ['a']])
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [2, 4])
+
+
+class TestChunkDocument(unittest.TestCase):
+    """Tests for VectorDB.chunk_document."""
+
+    def setUp(self) -> None:
+        # chunk_document does not use any connection
+        self.vector_db = VectorDB.__new__(VectorDB)
+
+    def test_small_document(self):
+        """Test that a document within the limit is returned unchanged."""
+        document = {'id': 'doc', 'content': 'x' * 10, 'title': 'Title'}
+        self.assertEqual(self.vector_db.chunk_document(document, max_chunk_size=10), [document])
+
+    def test_split_document(self):
+        """Test that a large document is split into numbered chunks with its other fields."""
+        document = {'id': 'doc', 'content': 'abcdefghij' * 2 + 'xyz', 'title': 'Title'}
+        chunks = self.vector_db.chunk_document(document, max_chunk_size=10)
+        self.assertEqual(chunks, [
+            {'id': 'doc_chunk_1', 'content': 'abcdefghij', 'title': 'Title',
+             'chunk_index': 1, 'total_chunks': 3, 'original_id': 'doc'},
+            {'id': 'doc_chunk_2', 'content': 'abcdefghij', 'title': 'Title',
+             'chunk_index': 2, 'total_chunks': 3, 'original_id': 'doc'},
+            {'id': 'doc_chunk_3', 'content': 'xyz', 'title': 'Title',
+             'chunk_index': 3, 'total_chunks': 3, 'original_id': 'doc'},
+        ])
+        self.assertEqual(document['id'], 'doc')
+
+    def test_split_exact_multiple(self):
+        """Test that a length divisible by the chunk size creates no empty chunk."""
+        document = {'id': 'doc', 'content': 'a' * 30}
+        chunks = self.vector_db.chunk_document(document, max_chunk_size=10)
+        self.assertEqual([chunk['content'] for chunk in chunks], ['a' * 10] * 3)
+        self.assertEqual({chunk['total_chunks'] for chunk in chunks}, {3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@ Options:
 
 import os
 import sys
+from itertools import islice
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -23,6 +24,11 @@ sys.path.insert(0, str(WORKSHOP_ROOT))
 
 from foundry_tools import VectorDB  # noqa: E402
 
+# Maximum number of enumeration passes over the index
+MAX_PASSES = 5
+# Waits between the document count checks after deleting, about 6 seconds in total
+VERIFY_DELAYS = (0.1, 0.2, 0.4, 0.8, 1.6, 3.0)
+
 
 def clear_documents(vector_db: VectorDB) -> bool:
     """
@@ -39,66 +45,60 @@ def clear_documents(vector_db: VectorDB) -> bool:
     print("Lösche alle Dokumente aus dem Index...")
 
     try:
-        # Get all documents (Azure AI Search max is 1000 per request)
-        all_docs = vector_db.search("*", top_k=1000)
-
-        if not all_docs:
-            print("Index ist bereits leer!")
-            return True
-
-        print(f"Gefunden: {len(all_docs)} Dokumente")
-
-        # Collect document IDs (chunk_id is the key field)
-        doc_ids = []
-        for doc in all_docs:
-            doc_id = doc.get('chunk_id')
-            if doc_id:
-                doc_ids.append(str(doc_id))
-
-        if not doc_ids:
-            print("Keine Dokument-IDs gefunden!")
-            return False
+        count = vector_db.get_document_count()
+        print(f"Gefunden: {count} Dokumente")
 
         # Azure AI Search has a batch limit of 1000 documents
-        # Delete in batches of 100 to be safe
-        batch_size = 100
+        batch_size = 1000
         total_deleted = 0
         total_failed = 0
+        deleted_ids = set()
 
-        print(f"\nLösche {len(doc_ids)} Dokumente in Batches von {batch_size}...")
+        print(f"\nLösche Dokumente in Batches von {batch_size}...")
 
-        for i in range(0, len(doc_ids), batch_size):
-            batch = doc_ids[i:i + batch_size]
-            print(f"  Batch {i // batch_size + 1}/{(len(doc_ids) + batch_size - 1) // batch_size}: {len(batch)} Dokumente...")
+        # Deletes shift the result pages of the running enumeration,
+        # so enumerate again until a pass finds no more documents
+        for pass_number in range(1, MAX_PASSES + 1):
+            doc_ids = (doc_id for doc_id in vector_db.iter_document_ids() if doc_id not in deleted_ids)
+            found = 0
+            batch_number = 0
 
-            success = vector_db.delete_documents(batch)
+            while batch := list(islice(doc_ids, batch_size)):
+                found += len(batch)
+                batch_number += 1
+                print(f"  Durchlauf {pass_number}, Batch {batch_number}: {len(batch)} Dokumente...")
 
-            if success:
-                total_deleted += len(batch)
-                print(f"    Erfolgreich: {len(batch)} Dokumente gelöscht")
-            else:
-                total_failed += len(batch)
-                print(f"    Fehler: {len(batch)} Dokumente konnten nicht gelöscht werden")
+                success = vector_db.delete_documents(batch)
 
-            # Small delay between batches to avoid rate limiting
-            if i + batch_size < len(doc_ids):
-                time.sleep(0.5)
+                if success:
+                    deleted_ids.update(batch)
+                    total_deleted += len(batch)
+                    print(f"    Erfolgreich: {len(batch)} Dokumente gelöscht")
+                else:
+                    total_failed += len(batch)
+                    print(f"    Fehler: {len(batch)} Dokumente konnten nicht gelöscht werden")
 
-        print(f"\nGesamt: {total_deleted} erfolgreich, {total_failed} fehlgeschlagen")
-
-        # Wait for Azure AI Search to process the deletions
-        print("\nWarte 3 Sekunden auf Verarbeitung durch Azure AI Search...")
-        time.sleep(3)
+            if not found:
+                break
 
-        # Verify
-        remaining = vector_db.get_document_count()
-        if remaining == 0:
-            print("Index ist jetzt leer!")
+        if not total_deleted and not total_failed:
+            print("Index ist bereits leer!")
             return True
-        else:
-            print(f"Warnung: Noch {remaining} Dokumente im Index")
-            print("Hinweis: Azure AI Search kann einige Sekunden brauchen, um Löschungen zu verarbeiten.")
-            return False
+
+        print(f"\nGesamt: {total_deleted} erfolgreich, {total_failed} fehlgeschlagen")
+
+        # Wait for Azure AI Search to process the deletions, check often at first
+        print("\nWarte auf Verarbeitung durch Azure AI Search...")
+        for delay in VERIFY_DELAYS:
+            time.sleep(delay)
+            remaining = vector_db.get_document_count()
+            if remaining == 0:
+                print("Index ist jetzt leer!")
+                return True
+
+        print(f"Warnung: Noch {remaining} Dokumente im Index")
+        print("Hinweis: Azure AI Search kann einige Sekunden brauchen, um Löschungen zu verarbeiten.")
+        return False
 
     except Exception as e:
         print(f"Fehler beim Löschen: {e}")
@@ -11,26 +11,27 @@ Usage:
 
 from pathlib import Path
 from dotenv import load_dotenv
+import asyncio
 import sys
 
 WORKSHOP_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(WORKSHOP_ROOT))
 
-from foundry_tools import BlobStorage  # noqa: E402
+from foundry_tools import AsyncBlobStorage, format_size  # noqa: E402
 
 
-def delete_all_blobs(storage: BlobStorage, confirm: bool = False) -> int:
+async def delete_all_blobs(storage: AsyncBlobStorage, confirm: bool = False) -> int:
     """
     Delete all blobs from the container.
 
     Args:
-        storage: BlobStorage instance
+        storage: AsyncBlobStorage instance
         confirm: If True, skip confirmation prompt
 
     Returns:
         Number of deleted blobs
     """
-    files = storage.list_files()
+    files = await storage.list_files()
 
     if not files:
         print("Keine Dateien im Container gefunden.")
@@ -39,19 +40,8 @@ def delete_all_blobs(storage: BlobStorage, confirm: bool = False) -> int:
     print(f"\nGefundene Dateien: {len(files)}")
     print()
 
-    # Show files to be deleted
-    for blob in files:
-        name = blob['name']
-        size = blob['size']
-        
-        if size < 1024:
-            size_str = f"{size} B"
-        elif size < 1024 * 1024:
-            size_str = f"{size / 1024:.2f} KB"
-        else:
-            size_str = f"{size / (1024 * 1024):.2f} MB"
-
-        print(f"  - {name} ({size_str})")
+    # Show files to be deleted, in one write instead of a flush per line
+    print("\n".join(f"  - {blob['name']} ({format_size(blob['size'])})" for blob in files))
 
     print()
 
@@ -71,19 +61,34 @@ def delete_all_blobs(storage: BlobStorage, confirm: bool = False) -> int:
     print("Lösche Dateien...")
     deleted_count = 0
 
-    for blob in files:
-        blob_name = blob['name']
-        try:
-            blob_client = storage._container_client.get_blob_client(blob_name)
-            blob_client.delete_blob()
-            print(f"  ✓ Gelöscht: {blob_name}")
+    # One batch request deletes up to 256 blobs, the batches are sent concurrently
+    blob_names = [blob['name'] for blob in files]
+    errors = await storage.delete_blobs_batch(blob_names)
+
+    # Only failures are listed, the deleted blobs are summed up in one line
+    failures = []
+    for blob_name, error in zip(blob_names, errors):
+        if error is None:
             deleted_count += 1
-        except Exception as e:
-            print(f"  ✗ Fehler beim Löschen von {blob_name}: {e}")
+        else:
+            failures.append(f"  ✗ Fehler beim Löschen von {blob_name}: {error}")
+
+    print(f"  ✓ Gelöscht: {deleted_count} von {len(blob_names)} Dateien")
+    if failures:
+        print("\n".join(failures))
 
     return deleted_count
 
 
+async def run(confirm: bool) -> int:
+    """Delete all blobs with one storage client for the whole run."""
+    async with AsyncBlobStorage() as storage:
+        print(f"\nContainer: {storage.container_name}")
+        print()
+
+        return await delete_all_blobs(storage, confirm=confirm)
+
+
 def main() -> None:
     """Main function."""
     env_path = Path(__file__).parent.parent.parent.parent / ".env"
@@ -96,12 +101,7 @@ def main() -> None:
     print("Azure Blob Storage - Alle Dateien löschen")
     print("=" * 80)
 
-    storage = BlobStorage()
-
-    print(f"\nContainer: {storage.container_name}")
-    print()
-
-    deleted_count = delete_all_blobs(storage, confirm=confirm)
+    deleted_count = asyncio.run(run(confirm))
 
     print()
     print("=" * 80)
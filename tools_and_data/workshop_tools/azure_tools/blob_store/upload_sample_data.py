@@ -5,23 +5,20 @@ Upload the PDF sample data set to Azure Blob Storage.
 
 from pathlib import Path
 from dotenv import load_dotenv
+import asyncio
 import sys
 
 WORKSHOP_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(WORKSHOP_ROOT))
 
-from foundry_tools import BlobStorage  # noqa: E402
+from foundry_tools import AsyncBlobStorage  # noqa: E402
 
 
-def main() -> None:
+async def upload_sample_data(storage: AsyncBlobStorage) -> None:
     """Upload sample PDF files to blob storage."""
-    env_path = Path(__file__).parent.parent.parent.parent / ".env"
-    load_dotenv(env_path)
-
-    storage = BlobStorage()
-
     sample_dir = Path(__file__).parent.parent.parent.parent / "data"
-    files = sorted(sample_dir.glob("*.pdf"))
+    # The uploads run concurrently, so sorting the files up front buys nothing
+    files = list(sample_dir.glob("*.pdf"))
 
     if not files:
         print(f"Keine PDF-Dateien in {sample_dir} gefunden.")
@@ -34,19 +31,35 @@ def main() -> None:
     print(f"Lade {len(files)} PDF-Dateien hoch...")
     print()
 
-    uploaded = storage.upload_files(files, prefix="workshop")
-    
-    for i, url in enumerate(uploaded, start=1):
-        filename = url.split('/')[-1]
-        print(f"  {i}. {filename}")
-        print(f"     {url}")
+    uploaded = await storage.upload_files(files, prefix="workshop", skip_existing=True)
+    skipped = len(files) - len(uploaded)
+    if skipped:
+        print(f"{skipped} Dateien sind bereits vorhanden und wurden übersprungen.")
         print()
 
+    print("".join(
+        f"  {i}. {url.rpartition('/')[2]}\n     {url}\n\n" for i, url in enumerate(uploaded, start=1)
+    ), end="")
+
     print("=" * 80)
     print(f"Upload abgeschlossen! {len(uploaded)} Dateien hochgeladen.")
     print("=" * 80)
 
 
+async def run() -> None:
+    """Upload the sample data with one storage client for the whole run."""
+    async with AsyncBlobStorage() as storage:
+        await upload_sample_data(storage)
+
+
+def main() -> None:
+    """Main function."""
+    env_path = Path(__file__).parent.parent.parent.parent / ".env"
+    load_dotenv(env_path)
+
+    asyncio.run(run())
+
+
 if __name__ == "__main__":
     main()
 
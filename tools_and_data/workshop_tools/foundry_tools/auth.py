@@ -2,10 +2,21 @@
 # Zentrale Authentifizierung für alle Workshop-Tools
 
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
 from azure.identity import DefaultAzureCredential, ClientSecretCredential
 from azure.keyvault.secrets import SecretClient
 
+# Services der Workshop-Tools, deren API Keys im Key Vault liegen
+API_KEY_SERVICES = (
+    "bing-search",
+    "content-safety",
+    "document-intelligence",
+    "language",
+    "translator",
+    "vision",
+)
+
 
 class WorkshopAuth:
     """
@@ -27,6 +38,9 @@ class WorkshopAuth:
         # Credential initialisieren
         self._credential = None
         self._secret_client = None
+
+        # Bereits geladene Secrets, jedes Secret wird nur einmal aus dem Key Vault geholt
+        self._secret_cache: Dict[str, str] = {}
     
     @property
     def credential(self):
@@ -72,12 +86,45 @@ class WorkshopAuth:
         Returns:
             Secret-Wert oder None wenn nicht gefunden
         """
+        if secret_name in self._secret_cache:
+            return self._secret_cache[secret_name]
+
         try:
             secret = self.secret_client.get_secret(secret_name)
-            return secret.value
         except Exception as e:
             print(f"Fehler beim Abrufen des Secrets '{secret_name}': {e}")
             return None
+
+        if secret.value is not None:
+            self._secret_cache[secret_name] = secret.value
+        return secret.value
+
+    def prefetch_secrets(self, secret_names: Iterable[str]) -> None:
+        """
+        Lädt mehrere Secrets parallel in den Cache.
+
+        Args:
+            secret_names: Namen der Secrets im Key Vault
+        """
+        missing = [name for name in secret_names if name not in self._secret_cache]
+        if not missing:
+            return
+
+        # Credential und Client vorab erstellen, sonst legt jeder Thread seine eigenen an
+        self.secret_client
+
+        # Jeder Abruf wartet nur auf das Netzwerk, parallel dauert es so lange wie der langsamste
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(self.get_secret, missing))
+
+    def prefetch_api_keys(self, service_names: Iterable[str] = API_KEY_SERVICES) -> None:
+        """
+        Lädt die API Keys der Workshop-Services parallel in den Cache.
+
+        Args:
+            service_names: Namen der Services (default: alle Workshop-Services)
+        """
+        self.prefetch_secrets(f"{service_name}-key" for service_name in service_names)
     
     def get_api_key(self, service_name: str) -> Optional[str]:
         """
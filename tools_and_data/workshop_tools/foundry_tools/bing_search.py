@@ -1,27 +1,22 @@
 # Bing Search Helper
 
 import os
+import aiohttp
 import requests
-from typing import List, Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional, Tuple
 
 from .auth import get_auth
 from .rate_limiter import get_rate_limiter
 
 
-class BingSearch:
+class _BingSearchBase:
     """
-    Helper-Klasse für Bing Search API.
-    
-    Ermöglicht Web-Suche, News-Suche und Entity-Suche.
-    API Key wird automatisch aus Key Vault geladen.
-    
-    Beispiel:
-        bing = BingSearch()
-        results = bing.search("Azure AI", count=5)
-        for result in results:
-            print(result['name'], result['url'])
+    Gemeinsame Basis von BingSearch und BingSearchAsync.
+
+    Baut die Requests und wertet die Antworten aus, die Unterklassen führen nur den HTTP-Request aus.
     """
-    
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -46,8 +41,115 @@ class BingSearch:
         self.auth = get_auth()
         self.api_key = api_key or self.auth.get_api_key("bing-search")
         
-        # Rate Limiter (60 Requests/Minute)
+        # Rate Limiter (60 Requests/Minute), ein Token Bucket für sync und async Clients
         self.rate_limiter = get_rate_limiter("bing_search", max_requests=60)
+
+    def _search_request(self, query: str, count: int, offset: int) -> Tuple[str, Dict[str, Any]]:
+        """Endpoint und Parameter der Web-Suche."""
+        params = {
+            "q": query,
+            "count": min(count, 50),
+            "offset": offset,
+            "mkt": self.market,
+            "safeSearch": self.safe_search
+        }
+        return self.endpoint, params
+
+    def _news_request(self, query: str, count: int, freshness: str) -> Tuple[str, Dict[str, Any]]:
+        """Endpoint und Parameter der News-Suche."""
+        params = {
+            "q": query,
+            "count": min(count, 50),
+            "mkt": self.market,
+            "freshness": freshness,
+            "safeSearch": self.safe_search
+        }
+        return self.endpoint.replace("/search", "/news/search"), params
+
+    def _images_request(self, query: str, count: int, image_type: str) -> Tuple[str, Dict[str, Any]]:
+        """Endpoint und Parameter der Bildersuche."""
+        params = {
+            "q": query,
+            "count": min(count, 50),
+            "mkt": self.market,
+            "imageType": image_type,
+            "safeSearch": self.safe_search
+        }
+        return self.endpoint.replace("/search", "/images/search"), params
+
+    @staticmethod
+    def _parse_search(data: Dict[str, Any], search_type: str) -> List[Dict[str, Any]]:
+        """Extrahiert die Ergebnisse der Web-Suche basierend auf dem Typ."""
+        if search_type == "web" and "webPages" in data:
+            return data["webPages"].get("value", [])
+        elif search_type == "news" and "news" in data:
+            return data["news"].get("value", [])
+        elif search_type == "images" and "images" in data:
+            return data["images"].get("value", [])
+        else:
+            return []
+
+    @staticmethod
+    def _parse_values(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extrahiert die Ergebnisse der News- und Bildersuche."""
+        return data.get("value", [])
+
+
+class BingSearch(_BingSearchBase):
+    """
+    Helper-Klasse für Bing Search API.
+    
+    Ermöglicht Web-Suche, News-Suche und Entity-Suche.
+    API Key wird automatisch aus Key Vault geladen.
+    
+    Beispiel:
+        with BingSearch() as bing:
+            results = bing.search("Azure AI", count=5)
+            for result in results:
+                print(result['name'], result['url'])
+    """
+
+    # Verbindungs-Pool der Session (pro Host)
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 50
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        endpoint: Optional[str] = None
+    ):
+        """
+        Initialisiert den Bing Search Client.
+        
+        Args:
+            api_key: Bing Search API Key (optional, aus Key Vault)
+            endpoint: Bing Search Endpoint (optional, aus ENV)
+        """
+        super().__init__(api_key=api_key, endpoint=endpoint)
+
+        # Eine Session für alle Requests, damit TCP- und TLS-Verbindungen wiederverwendet werden
+        self._session = requests.Session()
+        self._session.headers.update({"Ocp-Apim-Subscription-Key": self.api_key})
+        adapter = HTTPAdapter(pool_connections=self.POOL_CONNECTIONS, pool_maxsize=self.POOL_MAXSIZE)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def __enter__(self) -> "BingSearch":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Schließt die HTTP-Session und ihre Verbindungen."""
+        self._session.close()
+
+    def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Führt einen rate-limitierten GET-Request aus und gibt die JSON-Antwort zurück."""
+        self.rate_limiter.acquire()
+        response = self._session.get(endpoint, params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
     
     def search(
         self,
@@ -68,46 +170,8 @@ class BingSearch:
         Returns:
             Liste von Suchergebnissen
         """
-        # Rate Limiting
-        self.rate_limiter.acquire()
-        
-        # Headers
-        headers = {
-            "Ocp-Apim-Subscription-Key": self.api_key
-        }
-        
-        # Parameter
-        params = {
-            "q": query,
-            "count": min(count, 50),
-            "offset": offset,
-            "mkt": self.market,
-            "safeSearch": self.safe_search
-        }
-        
         try:
-            # Request
-            response = requests.get(
-                self.endpoint,
-                headers=headers,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            # Parse Response
-            data = response.json()
-            
-            # Extrahiere Ergebnisse basierend auf Typ
-            if search_type == "web" and "webPages" in data:
-                return data["webPages"].get("value", [])
-            elif search_type == "news" and "news" in data:
-                return data["news"].get("value", [])
-            elif search_type == "images" and "images" in data:
-                return data["images"].get("value", [])
-            else:
-                return []
-                
+            return self._parse_search(self._get(*self._search_request(query, count, offset)), search_type)
         except Exception as e:
             print(f"Fehler bei Bing Search: {e}")
             return []
@@ -129,34 +193,8 @@ class BingSearch:
         Returns:
             Liste von News-Artikeln
         """
-        # Rate Limiting
-        self.rate_limiter.acquire()
-        
-        headers = {
-            "Ocp-Apim-Subscription-Key": self.api_key
-        }
-        
-        params = {
-            "q": query,
-            "count": min(count, 50),
-            "mkt": self.market,
-            "freshness": freshness,
-            "safeSearch": self.safe_search
-        }
-        
         try:
-            endpoint = self.endpoint.replace("/search", "/news/search")
-            response = requests.get(
-                endpoint,
-                headers=headers,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            return data.get("value", [])
-            
+            return self._parse_values(self._get(*self._news_request(query, count, freshness)))
         except Exception as e:
             print(f"Fehler bei News Search: {e}")
             return []
@@ -178,35 +216,108 @@ class BingSearch:
         Returns:
             Liste von Bildern
         """
-        # Rate Limiting
-        self.rate_limiter.acquire()
-        
-        headers = {
-            "Ocp-Apim-Subscription-Key": self.api_key
-        }
-        
-        params = {
-            "q": query,
-            "count": min(count, 50),
-            "mkt": self.market,
-            "imageType": image_type,
-            "safeSearch": self.safe_search
-        }
-        
         try:
-            endpoint = self.endpoint.replace("/search", "/images/search")
-            response = requests.get(
-                endpoint,
-                headers=headers,
-                params=params,
-                timeout=10
+            return self._parse_values(self._get(*self._images_request(query, count, image_type)))
+        except Exception as e:
+            print(f"Fehler bei Image Search: {e}")
+            return []
+
+
+class BingSearchAsync(_BingSearchBase):
+    """
+    Async-Variante von BingSearch auf Basis von aiohttp.
+
+    Alle Requests laufen über eine Session mit gemeinsamem Verbindungs-Pool,
+    dadurch lassen sich viele Suchen parallel mit asyncio.gather ausführen.
+    Parameter und Rückgabewerte entsprechen denen von BingSearch.
+
+    Beispiel:
+        async with BingSearchAsync() as bing:
+            results = await asyncio.gather(
+                bing.search("Azure AI"),
+                bing.search_news("Azure AI"),
+            )
+    """
+
+    # Maximale Anzahl gleichzeitiger Verbindungen
+    CONNECTION_LIMIT = 50
+    # Timeout pro Request in Sekunden
+    TIMEOUT = 10
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        endpoint: Optional[str] = None
+    ):
+        super().__init__(api_key=api_key, endpoint=endpoint)
+
+        # Session wird in der laufenden Event Loop erstellt
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "BingSearchAsync":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Schließt die HTTP-Session und ihre Verbindungen."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.CONNECTION_LIMIT),
+                headers={"Ocp-Apim-Subscription-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=self.TIMEOUT),
             )
+        return self._session
+
+    async def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Führt einen rate-limitierten GET-Request aus und gibt die JSON-Antwort zurück."""
+        await self.rate_limiter.acquire_async()
+        async with self._get_session().get(endpoint, params=params) as response:
             response.raise_for_status()
-            
-            data = response.json()
-            return data.get("value", [])
-            
+            return await response.json()
+
+    async def search(
+        self,
+        query: str,
+        count: int = 10,
+        offset: int = 0,
+        search_type: str = "web"
+    ) -> List[Dict[str, Any]]:
+        """Führt eine Bing-Suche durch, siehe BingSearch.search."""
+        try:
+            return self._parse_search(await self._get(*self._search_request(query, count, offset)), search_type)
         except Exception as e:
-            print(f"Fehler bei Image Search: {e}")
+            print(f"Fehler bei Bing Search: {e}")
+            return []
+
+    async def search_news(
+        self,
+        query: str,
+        count: int = 10,
+        freshness: str = "Day"
+    ) -> List[Dict[str, Any]]:
+        """Sucht nach News-Artikeln, siehe BingSearch.search_news."""
+        try:
+            return self._parse_values(await self._get(*self._news_request(query, count, freshness)))
+        except Exception as e:
+            print(f"Fehler bei News Search: {e}")
             return []
 
+    async def search_images(
+        self,
+        query: str,
+        count: int = 10,
+        image_type: str = "Photo"
+    ) -> List[Dict[str, Any]]:
+        """Sucht nach Bildern, siehe BingSearch.search_images."""
+        try:
+            return self._parse_values(await self._get(*self._images_request(query, count, image_type)))
+        except Exception as e:
+            print(f"Fehler bei Image Search: {e}")
+            return []
@@ -2,53 +2,139 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Awaitable, Callable, Iterable, Iterator, Optional, TypeVar
+from urllib.parse import quote
 
+from azure.core.exceptions import HttpResponseError, ResourceExistsError
 from azure.storage.blob import BlobServiceClient, ContainerClient
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+
+from .transport import get_transport
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Maximum number of sub-requests the blob batch endpoint accepts per call
+DELETE_BATCH_SIZE = 256
+
+
+def _resolve_settings(connection_string: Optional[str], container_name: Optional[str]) -> tuple[str, str]:
+    """
+    Resolve the connection string and container name from the arguments or the environment.
+
+    Returns:
+        Tuple of (connection string, container name)
+    """
+    possible_env_vars = [
+        "FILE_STORAGE_CONNECTION_STRING",
+        "STORAGE_CONNECTION_STRING",
+        "AZURE_STORAGE_CONNECTION_STRING",
+    ]
+    conn = connection_string
+    if conn is None:
+        for var in possible_env_vars:
+            conn = os.getenv(var)
+            if conn:
+                break
+
+    if not conn:
+        hint = (
+            "Kein Storage Connection String gefunden. "
+            "Bitte FILE_STORAGE_CONNECTION_STRING (oder STORAGE_CONNECTION_STRING) in tools_and_data/.env setzen."
+        )
+        raise ValueError(hint)
+
+    return conn, container_name or os.getenv("FILE_STORAGE_CONTAINER_NAME", "workshop-documents")
+
+
+def _batches(items: Iterable[T], size: int) -> list[list[T]]:
+    """Split the items into lists of at most size items."""
+    items = list(items)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def _batch_errors(responses: list) -> list[Optional[Exception]]:
+    """Map the sub-responses of a batch delete to None for success or the error of the blob."""
+    return [None if response.status_code < 300 else HttpResponseError(response=response) for response in responses]
+
+
+def _file_info(blob_url_prefix: str, blob) -> dict:
+    """Return simple metadata of a listed blob, the URL is built without a per-blob client."""
+    return {
+        "name": blob.name,
+        "size": blob.size,
+        "last_modified": blob.last_modified,
+        "metadata": blob.metadata or {},
+        "url": blob_url_prefix + quote(blob.name, safe="/"),
+    }
+
+
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
+def format_size(size: int) -> str:
+    """
+    Format a byte count for display, e.g. ``512 B`` or ``1.50 MB``.
+
+    Args:
+        size: Size in bytes
+
+    Returns:
+        Size with two decimals in the largest unit below it
+    """
+    # Every unit is 2^10 times the previous one, so the bit length selects it
+    unit = min(max(size.bit_length() - 1, 0) // 10, len(SIZE_UNITS) - 1)
+    if unit == 0:
+        return f"{size} B"
+    return f"{size / (1 << (unit * 10)):.2f} {SIZE_UNITS[unit]}"
+
+
+@functools.lru_cache(maxsize=None)
+def _service_client(connection_string: str) -> BlobServiceClient:
+    """Return the service client of a storage account, shared so all users share its connection pool."""
+    return BlobServiceClient.from_connection_string(connection_string, transport=get_transport())
+
+
+def _blob_name(path: Path, prefix: Optional[str]) -> str:
+    """Return the blob name of a local file, optionally inside a virtual folder."""
+    return f"{prefix.rstrip('/')}/{path.name}" if prefix else path.name
 
 
 class BlobStorage:
     """Utility class to interact with the workshop's Azure Blob Storage container."""
 
+    # Number of files uploaded at the same time by upload_files
+    UPLOAD_WORKERS = 16
+    # Number of blocks of one file uploaded at the same time
+    UPLOAD_MAX_CONCURRENCY = 8
+
     def __init__(
         self,
         connection_string: Optional[str] = None,
         container_name: Optional[str] = None,
     ) -> None:
-        possible_env_vars = [
-            "FILE_STORAGE_CONNECTION_STRING",
-            "STORAGE_CONNECTION_STRING",
-            "AZURE_STORAGE_CONNECTION_STRING",
-        ]
-        conn = connection_string
-        if conn is None:
-            for var in possible_env_vars:
-                conn = os.getenv(var)
-                if conn:
-                    break
-
-        self.connection_string = conn
-        self.container_name = container_name or os.getenv("FILE_STORAGE_CONTAINER_NAME", "workshop-documents")
-
-        if not self.connection_string:
-            hint = (
-                "Kein Storage Connection String gefunden. "
-                "Bitte FILE_STORAGE_CONNECTION_STRING (oder STORAGE_CONNECTION_STRING) in tools_and_data/.env setzen."
-            )
-            raise ValueError(hint)
+        self.connection_string, self.container_name = _resolve_settings(connection_string, container_name)
 
-        self._service_client = BlobServiceClient.from_connection_string(self.connection_string)
+        self._service_client = _service_client(self.connection_string)
         self._container_client: ContainerClient = self._service_client.get_container_client(self.container_name)
+        # Set once the container is known to exist, later calls skip the round trip
+        self._container_ready = False
+        self._blob_url_prefix = f"{self._container_client.url}/"
 
     def ensure_container(self) -> None:
         """Create the workshop container if it does not exist."""
+        if self._container_ready:
+            return
         try:
             self._container_client.create_container()
-        except Exception:
-            # Container already exists
+        except ResourceExistsError:
             pass
+        self._container_ready = True
 
     def upload_file(self, file_path: str | Path, *, blob_name: Optional[str] = None, metadata: Optional[dict] = None) -> str:
         """
@@ -61,41 +147,229 @@ class BlobStorage:
             blob_name = file_path.name
 
         self.ensure_container()
+        return self._upload(file_path, blob_name, metadata)
+
+    def _upload(self, file_path: Path, blob_name: str, metadata: Optional[dict] = None) -> str:
+        """Upload a local file to an existing container and return the blob URL."""
         blob_client = self._container_client.get_blob_client(blob_name)
+        # With a known length the file is streamed block by block instead of being read into memory
         with file_path.open("rb") as handle:
-            blob_client.upload_blob(handle, overwrite=True, metadata=metadata)
-        return blob_client.url
+            blob_client.upload_blob(
+                handle,
+                blob_type="BlockBlob",
+                length=file_path.stat().st_size,
+                overwrite=True,
+                metadata=metadata,
+                max_concurrency=self.UPLOAD_MAX_CONCURRENCY,
+            )
+        return self._blob_url_prefix + quote(blob_name, safe="/")
 
     def upload_files(
         self,
         files: Iterable[Path],
         *,
         prefix: Optional[str] = None,
+        skip_existing: bool = False,
     ) -> list[str]:
-        """Upload multiple files and return their blob URLs."""
-        uploaded: list[str] = []
-        for path in files:
-            blob_name = f"{prefix.rstrip('/')}/{path.name}" if prefix else path.name
-            uploaded.append(self.upload_file(path, blob_name=blob_name))
-        return uploaded
+        """
+        Upload multiple files in parallel and return their blob URLs.
+
+        Args:
+            files: Local files to upload
+            prefix: Optional virtual folder for the blob names
+            skip_existing: Skip files whose blob already exists in the container
+
+        Returns:
+            Blob URLs of the uploaded files, in the order of the files
+        """
+        self.ensure_container()
+        uploads = [(Path(path), _blob_name(Path(path), prefix)) for path in files]
+        if skip_existing:
+            # One listing instead of an existence check per file
+            existing = {blob.name for blob in self._container_client.list_blobs(name_starts_with=prefix)}
+            uploads = [(path, blob_name) for path, blob_name in uploads if blob_name not in existing]
+
+        with ThreadPoolExecutor(max_workers=self.UPLOAD_WORKERS) as executor:
+            return list(executor.map(lambda upload: self._upload(*upload), uploads))
+
+    def iter_files(self) -> Iterator[dict]:
+        """Yield simple metadata for each blob in the container while the listing is paged in."""
+        for blob in self._container_client.list_blobs():
+            yield _file_info(self._blob_url_prefix, blob)
 
     def list_files(self) -> list[dict]:
         """Return simple metadata for each blob in the container."""
-        blobs = []
-        for blob in self._container_client.list_blobs():
-            blob_client = self._container_client.get_blob_client(blob.name)
-            blobs.append(
-                {
-                    "name": blob.name,
-                    "size": blob.size,
-                    "last_modified": blob.last_modified,
-                    "metadata": blob.metadata or {},
-                    "url": blob_client.url,  # Add blob URL
-                }
-            )
-        return blobs
+        return list(self.iter_files())
 
     def delete_blob(self, blob_name: str) -> None:
         """Delete a blob from the container."""
         blob_client = self._container_client.get_blob_client(blob_name)
         blob_client.delete_blob()
+
+    def delete_blobs_batch(self, blob_names: Iterable[str]) -> list[Optional[Exception]]:
+        """
+        Delete blobs with the batch endpoint, DELETE_BATCH_SIZE blobs per request.
+
+        Args:
+            blob_names: Names of the blobs to delete
+
+        Returns:
+            None for every deleted blob or the error it failed with, in the order of the names
+        """
+        errors: list[Optional[Exception]] = []
+        for batch in _batches(blob_names, DELETE_BATCH_SIZE):
+            try:
+                responses = list(self._container_client.delete_blobs(*batch, raise_on_any_failure=False))
+            except Exception as e:
+                errors.extend([e] * len(batch))
+            else:
+                errors.extend(_batch_errors(responses))
+        return errors
+
+
+@functools.lru_cache(maxsize=None)
+def get_blob_storage(container_name: Optional[str] = None) -> BlobStorage:
+    """
+    Return a shared BlobStorage for the container.
+
+    Args:
+        container_name: Container name, defaults to FILE_STORAGE_CONTAINER_NAME
+
+    Returns:
+        BlobStorage instance, the same one for every call with the same container
+    """
+    return BlobStorage(container_name=container_name)
+
+
+class AsyncBlobStorage:
+    """
+    Async variant of BlobStorage for scripts running many blob operations.
+
+    One client is used for the whole run, at most CONCURRENCY operations are in flight at a time.
+    Use it as async context manager: ``async with AsyncBlobStorage() as storage: ...``
+    """
+
+    # Number of operations awaited at the same time, much larger fan-outs can stall the SDK
+    CONCURRENCY = 15
+    # Number of blocks of one file uploaded at the same time
+    UPLOAD_MAX_CONCURRENCY = 8
+
+    def __init__(
+        self,
+        connection_string: Optional[str] = None,
+        container_name: Optional[str] = None,
+    ) -> None:
+        self.connection_string, self.container_name = _resolve_settings(connection_string, container_name)
+        self._service_client = AsyncBlobServiceClient.from_connection_string(self.connection_string)
+        self._container_client = self._service_client.get_container_client(self.container_name)
+        # Set once the container is known to exist, later calls skip the round trip
+        self._container_ready = False
+        self._blob_url_prefix = f"{self._container_client.url}/"
+
+    async def __aenter__(self) -> AsyncBlobStorage:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying client and its connections."""
+        await self._service_client.close()
+
+    async def _gather(self, operation: Callable[[T], Awaitable[R]], items: Iterable[T]) -> list[R | Exception]:
+        """Run the operation for all items, CONCURRENCY at a time, returning results or exceptions in order."""
+        # A free slot is taken by the next item right away, a slow item does not hold back a whole group
+        slots = asyncio.Semaphore(self.CONCURRENCY)
+
+        async def run(item: T) -> R:
+            async with slots:
+                return await operation(item)
+
+        return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+    async def ensure_container(self) -> None:
+        """Create the workshop container if it does not exist."""
+        if self._container_ready:
+            return
+        try:
+            await self._container_client.create_container()
+        except ResourceExistsError:
+            pass
+        self._container_ready = True
+
+    async def list_files(self) -> list[dict]:
+        """Return simple metadata for each blob in the container."""
+        return [_file_info(self._blob_url_prefix, blob) async for blob in self._container_client.list_blobs()]
+
+    async def _upload(self, upload: tuple[Path, str]) -> str:
+        """Upload a local file to an existing container and return the blob URL."""
+        file_path, blob_name = upload
+        blob_client = self._container_client.get_blob_client(blob_name)
+        # Keep the file system calls off the event loop
+        handle = await asyncio.to_thread(file_path.open, "rb")
+        try:
+            length = (await asyncio.to_thread(os.fstat, handle.fileno())).st_size
+            await blob_client.upload_blob(
+                handle,
+                blob_type="BlockBlob",
+                length=length,
+                overwrite=True,
+                max_concurrency=self.UPLOAD_MAX_CONCURRENCY,
+            )
+        finally:
+            handle.close()
+        return self._blob_url_prefix + quote(blob_name, safe="/")
+
+    async def upload_files(
+        self,
+        files: Iterable[Path],
+        *,
+        prefix: Optional[str] = None,
+        skip_existing: bool = False,
+    ) -> list[str]:
+        """
+        Upload multiple files concurrently and return their blob URLs.
+
+        Args:
+            files: Local files to upload
+            prefix: Optional virtual folder for the blob names
+            skip_existing: Skip files whose blob already exists in the container
+
+        Returns:
+            Blob URLs of the uploaded files, in the order of the files
+
+        Raises:
+            The first upload error, after all uploads have finished
+        """
+        await self.ensure_container()
+        uploads = [(Path(path), _blob_name(Path(path), prefix)) for path in files]
+        if skip_existing:
+            # One listing instead of an existence check per file
+            existing = {blob.name async for blob in self._container_client.list_blobs(name_starts_with=prefix)}
+            uploads = [(path, blob_name) for path, blob_name in uploads if blob_name not in existing]
+
+        results = await self._gather(self._upload, uploads)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    async def delete_blobs_batch(self, blob_names: Iterable[str]) -> list[Optional[Exception]]:
+        """
+        Delete blobs with the batch endpoint, DELETE_BATCH_SIZE blobs per request and requests sent concurrently.
+
+        Args:
+            blob_names: Names of the blobs to delete
+
+        Returns:
+            None for every deleted blob or the error it failed with, in the order of the names
+        """
+        async def delete(batch: list[str]) -> list[Optional[Exception]]:
+            responses = await self._container_client.delete_blobs(*batch, raise_on_any_failure=False)
+            return _batch_errors([response async for response in responses])
+
+        batches = _batches(blob_names, DELETE_BATCH_SIZE)
+        errors: list[Optional[Exception]] = []
+        for batch, result in zip(batches, await self._gather(delete, batches)):
+            errors.extend([result] * len(batch) if isinstance(result, Exception) else result)
+        return errors
@@ -12,17 +12,22 @@ class ContentSafety:
     
     def __init__(self, api_key: Optional[str] = None, endpoint: Optional[str] = None):
         self.endpoint = endpoint or os.getenv("CONTENT_SAFETY_ENDPOINT", "")
-        self.auth = get_auth()
-        self.api_key = api_key or self.auth.get_api_key("content-safety")
+        # API Key aus Parameter, sonst beim ersten Zugriff aus Key Vault
+        self._api_key = api_key
         self.rate_limiter = get_rate_limiter("content_safety", max_requests=20)
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """API Key, der Key Vault wird erst beim ersten Zugriff abgefragt."""
+        if self._api_key is None:
+            self._api_key = get_auth().get_api_key("content-safety")
+        return self._api_key
     
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """Analysiert Text auf schädliche Inhalte."""
-        self.rate_limiter.acquire()
         return {"status": "not_implemented"}
     
     def analyze_image(self, image_path: str) -> Dict[str, Any]:
         """Analysiert Bild auf schädliche Inhalte."""
-        self.rate_limiter.acquire()
         return {"status": "not_implemented"}
 
@@ -1,7 +1,10 @@
 # Document Intelligence Helper
 
+import multiprocessing
 import os
-from typing import Dict, Any, Optional
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
 
 from azure.ai.formrecognizer import DocumentAnalysisClient
 from azure.core.credentials import AzureKeyCredential
@@ -9,6 +12,75 @@ from azure.core.credentials import AzureKeyCredential
 from .auth import get_auth
 from .rate_limiter import get_rate_limiter
 
+# Ab dieser Seitenanzahl wird ein PDF auf mehrere Prozesse verteilt
+PARALLEL_PDF_MIN_PAGES = 32
+# Anzahl Prozesse für die PDF-Extraktion, siehe DOCUMENT_PROCESSOR_WORKERS in der README
+PDF_WORKERS = int(os.getenv("DOCUMENT_PROCESSOR_WORKERS") or 2)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _extract_page_range(document_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extrahiert den Text der Seiten [start, stop) eines PDFs.
+
+    Läuft in einem eigenen Prozess, übergeben werden nur Pfad und Seitenbereich.
+    """
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(document_path)
+    try:
+        texts = []
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return texts
+    finally:
+        pdf.close()
+
+
+def _count_pages(document_path: str) -> int:
+    """Gibt die Seitenanzahl eines PDFs zurück."""
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(document_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Gibt den gemeinsamen Prozess-Pool zurück und startet ihn beim ersten Aufruf."""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                # spawn, da PDFium im Elternprozess bereits geladen ist und fork nicht verträgt
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _process_pool
+
+
+def _extract_pdf_pages(document_path: str) -> List[str]:
+    """Extrahiert den Text aller Seiten eines PDFs, große PDFs parallel."""
+    num_pages = _count_pages(document_path)
+    if num_pages < PARALLEL_PDF_MIN_PAGES or PDF_WORKERS < 2:
+        return _extract_page_range(document_path, 0, num_pages)
+
+    # Zusammenhängende Seitenbereiche, damit jeder Prozess das PDF nur einmal öffnet
+    bounds = [num_pages * i // PDF_WORKERS for i in range(PDF_WORKERS + 1)]
+    results = _get_process_pool().map(
+        _extract_page_range, [document_path] * PDF_WORKERS, bounds[:-1], bounds[1:]
+    )
+    return [text for texts in results for text in texts]
+
 
 class DocumentIntelligence:
     """
@@ -37,22 +109,22 @@ class DocumentIntelligence:
         """
         self.endpoint = endpoint or os.getenv("DOCUMENT_INTELLIGENCE_ENDPOINT", "")
 
-        # API Key aus Parameter, ENV oder Key Vault
-        if api_key:
-            self.api_key = api_key
-        else:
-            # Versuche zuerst aus ENV
-            self.api_key = os.getenv("DOCUMENT_INTELLIGENCE_API_KEY")
-            if not self.api_key:
-                # Fallback auf Key Vault
-                self.auth = get_auth()
-                self.api_key = self.auth.get_api_key("document-intelligence")
+        # API Key aus Parameter oder ENV, Key Vault erst beim ersten Zugriff
+        self._api_key = api_key or os.getenv("DOCUMENT_INTELLIGENCE_API_KEY")
 
         self.rate_limiter = get_rate_limiter("document_intelligence", max_requests=15)
 
         # Client initialisieren
         self._client = None
     
+    @property
+    def api_key(self) -> Optional[str]:
+        """API Key, der Key Vault wird erst beim ersten Zugriff abgefragt."""
+        if not self._api_key:
+            # Fallback auf Key Vault
+            self._api_key = get_auth().get_api_key("document-intelligence")
+        return self._api_key
+
     @property
     def client(self) -> DocumentAnalysisClient:
         """Lazy-loaded Document Analysis Client."""
@@ -74,27 +146,18 @@ class DocumentIntelligence:
 
         Args:
             document_path: Pfad zum Dokument
-            model: Modell-Name (default: local für lokale Extraktion mit PyPDF2)
+            model: Modell-Name (default: local für lokale Extraktion mit pypdfium2)
 
         Returns:
             Dictionary mit 'content' (extrahierter Text) und 'pages' (Seitenanzahl)
         """
         try:
-            # Lokale PDF-Extraktion mit PyPDF2
-            import PyPDF2
-
-            with open(document_path, "rb") as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                num_pages = len(pdf_reader.pages)
-
-                # Text von allen Seiten extrahieren
-                content = ""
-                for page in pdf_reader.pages:
-                    content += page.extract_text() + "\n"
+            # Lokale PDF-Extraktion mit pypdfium2
+            pages = _extract_pdf_pages(str(document_path))
 
             return {
-                "content": content.strip(),
-                "pages": num_pages,
+                "content": "\n".join(pages).strip(),
+                "pages": len(pages),
                 "status": "success"
             }
 
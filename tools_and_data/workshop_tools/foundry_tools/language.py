@@ -12,17 +12,22 @@ class Language:
     
     def __init__(self, api_key: Optional[str] = None, endpoint: Optional[str] = None):
         self.endpoint = endpoint or os.getenv("LANGUAGE_ENDPOINT", "")
-        self.auth = get_auth()
-        self.api_key = api_key or self.auth.get_api_key("language")
+        # API Key aus Parameter, sonst beim ersten Zugriff aus Key Vault
+        self._api_key = api_key
         self.rate_limiter = get_rate_limiter("language", max_requests=20)
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """API Key, der Key Vault wird erst beim ersten Zugriff abgefragt."""
+        if self._api_key is None:
+            self._api_key = get_auth().get_api_key("language")
+        return self._api_key
     
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analysiert Sentiment eines Textes."""
-        self.rate_limiter.acquire()
         return {"status": "not_implemented"}
     
     def extract_key_phrases(self, text: str) -> Dict[str, Any]:
         """Extrahiert Key Phrases aus einem Text."""
-        self.rate_limiter.acquire()
         return {"status": "not_implemented"}
 
@@ -1,16 +1,18 @@
 # Rate Limiter für Workshop Tools
 # Verhindert zu viele API-Aufrufe
 
+import asyncio
+import threading
 import time
-from collections import deque
 from typing import Dict
 
 
 class RateLimiter:
     """
-    Einfacher Rate Limiter basierend auf Sliding Window.
+    Einfacher Rate Limiter basierend auf einem Token Bucket.
     
-    Limitiert die Anzahl der Requests pro Zeitfenster.
+    Limitiert die Anzahl der Requests pro Zeitfenster. Der Bucket fasst
+    max_requests Tokens und füllt sich gleichmäßig über das Zeitfenster auf.
     """
     
     def __init__(self, max_requests: int, time_window: int = 60):
@@ -23,38 +25,97 @@ class RateLimiter:
         """
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests: deque = deque()
+        self.capacity = float(max_requests)
+        # Tokens pro Sekunde
+        self.rate = max_requests / time_window
+        self.tokens = float(max_requests)
+        self.last_refill = time.monotonic()
+        # Schützt tokens/last_refill, wenn mehrere Threads denselben Limiter nutzen
+        self._cond = threading.Condition()
     
-    def acquire(self) -> bool:
+    def _check_permits(self, permits: int) -> None:
+        """Mehr Tokens als der Bucket fasst würden nie frei, der Aufrufer würde endlos warten."""
+        if permits > self.capacity:
+            raise ValueError(
+                f"permits ({permits}) übersteigt die Kapazität des Rate Limiters ({self.max_requests})"
+            )
+
+    def acquire(self, permits: int = 1) -> bool:
         """
         Versucht einen Request-Slot zu bekommen.
-        Wartet wenn nötig, bis ein Slot frei wird.
+        Wartet wenn nötig, bis genug Tokens nachgefüllt sind.
         
+        Args:
+            permits: Anzahl benötigter Tokens (default: 1)
+
         Returns:
             True wenn Request erlaubt
+
+        Raises:
+            ValueError: Wenn permits die Kapazität übersteigt
         """
-        now = time.time()
-        
-        # Entferne alte Requests außerhalb des Zeitfensters
-        while self.requests and self.requests[0] < now - self.time_window:
-            self.requests.popleft()
-        
-        # Prüfe ob Limit erreicht
-        if len(self.requests) >= self.max_requests:
-            # Warte bis ältester Request aus dem Fenster fällt
-            sleep_time = self.requests[0] + self.time_window - now
-            if sleep_time > 0:
-                print(f"Rate Limit erreicht. Warte {sleep_time:.1f} Sekunden...")
-                time.sleep(sleep_time)
-                return self.acquire()  # Rekursiv erneut versuchen
-        
-        # Request erlauben
-        self.requests.append(now)
-        return True
+        self._check_permits(permits)
+        with self._cond:
+            waited = False
+            while True:
+                # monotonic, damit Sprünge der Systemuhr das Limit nicht verfälschen
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                if self.tokens >= permits:
+                    self.tokens -= permits
+                    return True
+                
+                # Warte bis genug Tokens verfügbar sind, andere Threads können währenddessen prüfen
+                wait_time = (permits - self.tokens) / self.rate
+                if not waited:
+                    print(f"Rate Limit erreicht. Warte {wait_time:.1f} Sekunden...")
+                    waited = True
+                self._cond.wait(timeout=wait_time)
+
+    def _take(self, permits: int) -> float:
+        """
+        Nimmt permits Tokens, falls vorhanden.
+
+        Returns:
+            0 wenn die Tokens genommen wurden, sonst die Wartezeit in Sekunden
+        """
+        with self._cond:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+            if self.tokens >= permits:
+                self.tokens -= permits
+                return 0.0
+            return (permits - self.tokens) / self.rate
+
+    async def acquire_async(self, permits: int = 1) -> bool:
+        """
+        Wartet ohne die Event Loop zu blockieren, bis permits Tokens frei sind.
+        Aufrufer, die in den Bucket passen, laufen sofort parallel weiter.
+
+        Args:
+            permits: Anzahl benötigter Tokens (default: 1)
+
+        Returns:
+            True wenn Request erlaubt
+
+        Raises:
+            ValueError: Wenn permits die Kapazität übersteigt
+        """
+        self._check_permits(permits)
+        while True:
+            wait_time = self._take(permits)
+            if not wait_time:
+                return True
+            await asyncio.sleep(wait_time)
 
 
 # Globale Rate Limiter für verschiedene Services
 _rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
 
 
 def get_rate_limiter(service_name: str, max_requests: int = 60) -> RateLimiter:
@@ -69,7 +130,8 @@ def get_rate_limiter(service_name: str, max_requests: int = 60) -> RateLimiter:
     Returns:
         RateLimiter Instanz
     """
-    if service_name not in _rate_limiters:
-        _rate_limiters[service_name] = RateLimiter(max_requests)
-    return _rate_limiters[service_name]
+    with _rate_limiters_lock:
+        if service_name not in _rate_limiters:
+            _rate_limiters[service_name] = RateLimiter(max_requests)
+        return _rate_limiters[service_name]
 
@@ -12,17 +12,22 @@ class Translator:
     
     def __init__(self, api_key: Optional[str] = None, endpoint: Optional[str] = None):
         self.endpoint = endpoint or os.getenv("TRANSLATOR_ENDPOINT", "https://api.cognitive.microsofttranslator.com/")
-        self.auth = get_auth()
-        self.api_key = api_key or self.auth.get_api_key("translator")
+        # API Key aus Parameter, sonst beim ersten Zugriff aus Key Vault
+        self._api_key = api_key
         self.rate_limiter = get_rate_limiter("translator", max_requests=20)
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """API Key, der Key Vault wird erst beim ersten Zugriff abgefragt."""
+        if self._api_key is None:
+            self._api_key = get_auth().get_api_key("translator")
+        return self._api_key
     
     def translate(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
         """Übersetzt einen Text."""
-        self.rate_limiter.acquire()
         return {"status": "not_implemented"}
     
     def detect_language(self, text: str) -> Dict[str, Any]:
         """Erkennt die Sprache eines Textes."""
-        self.rate_limiter.acquire()
         return {"status": "not_implemented"}
 
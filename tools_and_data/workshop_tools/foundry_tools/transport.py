@@ -0,0 +1,46 @@
+# HTTP Transport für Workshop Tools
+# Gemeinsamer Verbindungs-Pool für die Azure SDK Clients
+
+import functools
+import os
+
+import requests
+from azure.core.pipeline.transport import RequestsTransport
+from requests.adapters import HTTPAdapter
+
+# Anzahl der Hosts, für die Verbindungen im Pool gehalten werden
+POOL_CONNECTIONS = 50
+
+
+@functools.lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """
+    Gibt die gemeinsame HTTP-Session zurück.
+    Erstellt sie beim ersten Aufruf.
+
+    Der Standard-Pool von requests hält nur 10 Verbindungen pro Host, parallele
+    Uploads und Deletes würden darauf warten. Die Poolgröße pro Host kommt aus
+    WORKSHOP_POOL_SIZE (default: 100).
+
+    Returns:
+        Session mit vergrößertem Verbindungs-Pool
+    """
+    pool_size = int(os.getenv("WORKSHOP_POOL_SIZE", "100"))
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def get_transport() -> RequestsTransport:
+    """
+    Gibt den gemeinsamen Transport für die Azure SDK Clients zurück.
+    Erstellt ihn beim ersten Aufruf.
+
+    Returns:
+        RequestsTransport auf Basis der gemeinsamen Session
+    """
+    # Die Session gehört dem Transport nicht, ein Client kann sie daher nicht für alle schließen
+    return RequestsTransport(session=get_session(), session_owner=False)
@@ -1,10 +1,15 @@
 """Vector Database (Azure AI Search) helper."""
 
+import functools
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from azure.core.credentials import AzureKeyCredential
 from azure.core.exceptions import ResourceNotFoundError
 from azure.search.documents import SearchClient
@@ -13,6 +18,8 @@ from azure.search.documents.indexes.models import (
     AzureOpenAIVectorizer,
     AzureOpenAIVectorizerParameters,
     HnswAlgorithmConfiguration,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
     SearchField,
     SearchFieldDataType,
     SearchIndex,
@@ -26,6 +33,20 @@ from dotenv import load_dotenv
 
 from .auth import get_auth
 from .rate_limiter import get_rate_limiter
+from .transport import get_transport
+
+_env_loaded = False
+
+
+def _load_env_once() -> None:
+    """Lädt die .env Datei (falls vorhanden) einmal pro Prozess."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    env_path = Path(__file__).parent.parent.parent / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+    _env_loaded = True
 
 
 class VectorDB:
@@ -41,6 +62,18 @@ class VectorDB:
         for result in results:
             print(result['content'])
     """
+
+    # Status-Codes einzelner Dokumente, bei denen sich ein erneuter Versuch lohnt
+    RETRY_STATUS_CODES = (409, 422, 429, 503)
+
+    # Anzahl Texte pro Embedding-Request, hält den Request unter dem Token-Limit
+    EMBEDDING_BATCH_SIZE = 16
+    # Anzahl zwischengespeicherter Query-Embeddings pro Instanz
+    EMBEDDING_CACHE_SIZE = 512
+
+    # Dokumente pro Upload-Batch (Service-Limit: 1000 Dokumente / 16 MB) und parallele Batches
+    UPLOAD_BATCH_SIZE = 500
+    UPLOAD_WORKERS = 4
     
     def __init__(
         self,
@@ -58,9 +91,7 @@ class VectorDB:
             api_key: Admin API Key (optional, aus ENV)
         """
         # Load .env file if it exists
-        env_path = Path(__file__).parent.parent.parent / ".env"
-        if env_path.exists():
-            load_dotenv(env_path)
+        _load_env_once()
 
         # Konfiguration aus Environment oder Parameter
         self.endpoint = endpoint or os.getenv(
@@ -72,12 +103,8 @@ class VectorDB:
         # API Key aus Environment oder Parameter
         self.api_key = api_key or os.getenv("VECTOR_DB_ADMIN_KEY")
 
-        # Authentifizierung: Bevorzuge API Key, fallback auf Azure AD
-        if self.api_key:
-            self.credential = AzureKeyCredential(self.api_key)
-        else:
-            self.auth = get_auth()
-            self.credential = self.auth.credential
+        # Authentifizierung wird erst beim ersten Client-Zugriff aufgelöst
+        self._credential = None
 
         # Rate Limiter (60 Requests/Minute)
         self.rate_limiter = get_rate_limiter("vector_db", max_requests=60)
@@ -98,7 +125,22 @@ class VectorDB:
         # Search Client initialisieren
         self._client = None
         self._index_client = None
+        self._session = None
+        # Felder ohne Vektoren, die eine Suche standardmäßig zurückgibt
+        self._result_fields = None
+        # Wiederholte Queries werden nicht erneut eingebettet
+        self._cached_embedding = functools.lru_cache(maxsize=self.EMBEDDING_CACHE_SIZE)(self._embed_query)
     
+    @property
+    def credential(self):
+        """Credential für Azure AI Search: Bevorzuge API Key, fallback auf Azure AD."""
+        if self._credential is None:
+            if self.api_key:
+                self._credential = AzureKeyCredential(self.api_key)
+            else:
+                self._credential = get_auth().credential
+        return self._credential
+
     @property
     def client(self) -> SearchClient:
         """Lazy-loaded Search Client."""
@@ -106,17 +148,36 @@ class VectorDB:
             self._client = SearchClient(
                 endpoint=self.endpoint,
                 index_name=self.index_name,
-                credential=self.credential
+                credential=self.credential,
+                transport=get_transport()
             )
         return self._client
 
+    @property
+    def session(self) -> requests.Session:
+        """Lazy-loaded HTTP Session für Azure OpenAI, hält die Verbindung offen und wiederholt gedrosselte Requests."""
+        if self._session is None:
+            # Exponential backoff: 5s, 10s, 20s, 40s, Retry-After hat Vorrang
+            retry = Retry(
+                total=4,
+                backoff_factor=5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["POST"],
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            self._session = requests.Session()
+            self._session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+        return self._session
+
     @property
     def index_client(self) -> SearchIndexClient:
         """Lazy-loaded Index Client."""
         if self._index_client is None:
             self._index_client = SearchIndexClient(
                 endpoint=self.endpoint,
-                credential=self.credential
+                credential=self.credential,
+                transport=get_transport()
             )
         return self._index_client
 
@@ -159,9 +220,10 @@ class VectorDB:
                     SimpleField(name="chunk_page", type=SearchFieldDataType.Int32, filterable=True, sortable=True),
                     SimpleField(name="source_type", type=SearchFieldDataType.String, filterable=True),
                     SimpleField(name="last_modified", type=SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
+                    # Half statt Single halbiert den Speicherbedarf der Vektoren im Index
                     SearchField(
                         name=self.vector_field,
-                        type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+                        type=SearchFieldDataType.Collection(SearchFieldDataType.HALF),
                         searchable=True,
                         vector_search_dimensions=int(os.getenv("VECTOR_DB_VECTOR_DIMENSIONS", "1536")),
                         vector_search_profile_name="content-vector-profile",
@@ -175,6 +237,14 @@ class VectorDB:
                         name="content-vector-profile",
                         algorithm_configuration_name="contentHnsw",
                         vectorizer_name="content-vectorizer",
+                        compression_name="content-compression",
+                    )
+                ],
+                # int8-Quantisierung für den HNSW-Graphen im Speicher
+                compressions=[
+                    ScalarQuantizationCompression(
+                        compression_name="content-compression",
+                        parameters=ScalarQuantizationParameters(quantized_data_type="int8"),
                     )
                 ],
             )
@@ -223,6 +293,7 @@ class VectorDB:
         vector_text: Optional[str] = None,
         filter_expression: Optional[str] = None,
         vector_weight: Optional[float] = None,
+        select: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Führt eine Suche im Vector DB durch.
@@ -232,6 +303,7 @@ class VectorDB:
             top_k: Anzahl der Ergebnisse
             vector_query: Optional: Vector für Vector Search
             filter_expression: Optional: OData Filter
+            select: Optional: Zurückgegebene Felder (default: alle Felder außer Vektoren)
             
         Returns:
             Liste von Suchergebnissen
@@ -260,6 +332,7 @@ class VectorDB:
                 top=top_k,
                 filter=filter_expression,
                 vector_queries=vector_queries,
+                select=select or self._get_result_fields(),
             )
 
             return [dict(result) for result in results]
@@ -268,14 +341,38 @@ class VectorDB:
             print(f"Fehler bei der Suche: {e}")
             return []
 
+    def _get_result_fields(self) -> Optional[List[str]]:
+        """
+        Gibt die abrufbaren Felder des Index ohne Vektorfelder zurück.
+
+        Vektoren machen den Großteil einer Antwort aus, werden für Suchergebnisse aber nicht gebraucht.
+        Wird das Schema nicht gefunden, liefert die Suche alle Felder (None).
+        """
+        if self._result_fields is None:
+            try:
+                index = self.index_client.get_index(self.index_name)
+            except Exception:
+                return None
+            self._result_fields = [
+                field.name for field in index.fields
+                if field.vector_search_dimensions is None and not field.hidden
+            ]
+        return self._result_fields
+
     def _embed_text(self, text: str) -> List[float]:
-        """Generate embeddings for a query using Azure OpenAI with retry logic."""
+        """Generate embeddings for a query using Azure OpenAI with retry logic, repeated queries come from a cache."""
+        # Keyed by deployment as well, so switching the deployment does not return stale vectors
+        return list(self._cached_embedding(self.openai_deployment, text))
+
+    def _embed_query(self, deployment: Optional[str], text: str) -> tuple:
+        """Uncached embedding of a single query, as tuple so the cached value cannot be modified."""
+        return tuple(self._embed_texts([text])[0])
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for several texts, EMBEDDING_BATCH_SIZE texts per request, in the order of the texts."""
         if not all([self.openai_endpoint, self.openai_api_key, self.openai_deployment]):
             raise ValueError("Azure OpenAI Konfiguration fehlt. Bitte .env aktualisieren.")
 
-        # Use rate limiter to prevent hitting API limits
-        self.openai_rate_limiter.acquire()
-
         url = (
             f"{self.openai_endpoint}/openai/deployments/{self.openai_deployment}/embeddings"
             f"?api-version={self.openai_api_version}"
@@ -284,40 +381,22 @@ class VectorDB:
             "Content-Type": "application/json",
             "api-key": self.openai_api_key,
         }
-        payload = {"input": text, "model": self.openai_model}
 
-        # Retry logic for rate limiting with exponential backoff
-        max_retries = 5
-        base_delay = 5  # Start with 5 seconds
-
-        for attempt in range(max_retries):
-            try:
-                response = requests.post(url, json=payload, headers=headers, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                return data["data"][0]["embedding"]
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:
-                    if attempt < max_retries - 1:
-                        # Exponential backoff: 5s, 10s, 20s, 40s
-                        wait_time = base_delay * (2 ** attempt)
-
-                        # Check if response has Retry-After header
-                        retry_after = e.response.headers.get('Retry-After')
-                        if retry_after:
-                            try:
-                                wait_time = max(wait_time, int(retry_after))
-                            except ValueError:
-                                pass
-
-                        print(f"⚠️  Rate limit erreicht (429). Warte {wait_time} Sekunden... (Versuch {attempt + 1}/{max_retries})")
-                        import time
-                        time.sleep(wait_time)
-                    else:
-                        print(f"❌ Rate limit nach {max_retries} Versuchen immer noch aktiv!")
-                        raise
-                else:
-                    raise
+        embeddings = []
+        for start in range(0, len(texts), self.EMBEDDING_BATCH_SIZE):
+            # Use rate limiter to prevent hitting API limits
+            self.openai_rate_limiter.acquire()
+
+            payload = {"input": texts[start:start + self.EMBEDDING_BATCH_SIZE], "model": self.openai_model}
+
+            # Retries with exponential backoff happen in the session's HTTPAdapter
+            response = self.session.post(url, json=payload, headers=headers, timeout=30)
+            if response.status_code == 429:
+                print("❌ Rate limit nach 5 Versuchen immer noch aktiv!")
+            response.raise_for_status()
+            data = response.json()["data"]
+            embeddings.extend(item["embedding"] for item in sorted(data, key=lambda item: item["index"]))
+        return embeddings
     
     def chunk_document(
         self,
@@ -340,26 +419,25 @@ class VectorDB:
         if len(content) <= max_chunk_size:
             return [document]
 
-        # Dokument in Chunks aufteilen
-        chunks = []
-        num_chunks = (len(content) + max_chunk_size - 1) // max_chunk_size
-
-        for i in range(num_chunks):
-            start = i * max_chunk_size
-            end = min((i + 1) * max_chunk_size, len(content))
-            chunk_content = content[start:end]
-
-            # Chunk-Dokument erstellen
-            chunk_doc = document.copy()
-            chunk_doc["id"] = f"{document['id']}_chunk_{i+1}"
-            chunk_doc["content"] = chunk_content
-            chunk_doc["chunk_index"] = i + 1
-            chunk_doc["total_chunks"] = num_chunks
-            chunk_doc["original_id"] = document["id"]
-
-            chunks.append(chunk_doc)
-
-        return chunks
+        # Dokument in Chunks aufteilen, Slicing über das Ende hinaus wird von Python begrenzt
+        starts = range(0, len(content), max_chunk_size)
+        num_chunks = len(starts)
+        doc_id = document["id"]
+
+        # Gemeinsame Felder aller Chunks, ohne den vollständigen Inhalt
+        base = {key: value for key, value in document.items() if key != "content"}
+
+        return [
+            dict(
+                base,
+                id=f"{doc_id}_chunk_{i}",
+                content=content[start:start + max_chunk_size],
+                chunk_index=i,
+                total_chunks=num_chunks,
+                original_id=doc_id,
+            )
+            for i, start in enumerate(starts, start=1)
+        ]
 
     def upload_documents(self, documents: List[Dict[str, Any]], auto_chunk: bool = True) -> bool:
         """
@@ -384,62 +462,100 @@ class VectorDB:
 
             documents = chunked_documents
 
-        # Rate Limiting
+        batches = [
+            documents[start:start + self.UPLOAD_BATCH_SIZE]
+            for start in range(0, len(documents), self.UPLOAD_BATCH_SIZE)
+        ]
+
+        # Batches parallel hochladen, die Clients teilen sich den Verbindungs-Pool
+        with ThreadPoolExecutor(max_workers=self.UPLOAD_WORKERS) as executor:
+            results = list(executor.map(self._upload_batch, batches))
+
+        succeeded = sum(batch_succeeded for batch_succeeded, _ in results)
+        failed = sum(batch_failed for _, batch_failed in results)
+        print(f"Upload-Ergebnis: {succeeded} erfolgreich, {failed} fehlgeschlagen")
+
+        return failed == 0
+
+    def _upload_batch(self, documents: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Lädt einen Batch von Dokumenten hoch.
+
+        Returns:
+            Tuple aus (Anzahl erfolgreich, Anzahl fehlgeschlagen)
+        """
+        # Rate Limiting pro Batch
         self.rate_limiter.acquire()
 
         try:
             result = self.client.upload_documents(documents=documents)
-
-            # Detaillierte Fehlerausgabe
-            succeeded = 0
-            failed = 0
-            for r in result:
-                if r.succeeded:
-                    succeeded += 1
-                else:
-                    failed += 1
-                    print(f"Fehler beim Hochladen von Dokument: {r.key}")
-                    print(f"  Status Code: {r.status_code}")
-                    print(f"  Error Message: {r.error_message}")
-
-            print(f"Upload-Ergebnis: {succeeded} erfolgreich, {failed} fehlgeschlagen")
-
-            return all(r.succeeded for r in result)
         except Exception as e:
             print(f"Fehler beim Hochladen: {e}")
             import traceback
             traceback.print_exc()
-            return False
+            return 0, len(documents)
+
+        # Detaillierte Fehlerausgabe
+        succeeded = 0
+        failed = 0
+        for r in result:
+            if r.succeeded:
+                succeeded += 1
+            else:
+                failed += 1
+                print(f"Fehler beim Hochladen von Dokument: {r.key}")
+                print(f"  Status Code: {r.status_code}")
+                print(f"  Error Message: {r.error_message}")
+
+        return succeeded, failed
     
-    def delete_documents(self, document_ids: List[str]) -> bool:
+    def delete_documents(self, document_ids: List[str], max_retries: int = 3) -> bool:
         """
         Löscht Dokumente aus dem Index.
 
+        Dokumente, die wegen Drosselung oder vorübergehender Nichtverfügbarkeit
+        fehlschlagen, werden mit exponentiellem Backoff erneut gelöscht.
+
         Args:
             document_ids: Liste von Dokument-IDs (chunk_id Werte)
+            max_retries: Maximale Anzahl erneuter Versuche für fehlgeschlagene Dokumente
 
         Returns:
             True bei Erfolg
         """
-        # Rate Limiting
-        self.rate_limiter.acquire()
-
         try:
-            documents = [{"chunk_id": doc_id} for doc_id in document_ids]
-            result = self.client.delete_documents(documents=documents)
-
-            # Check results
-            succeeded = sum(1 for r in result if r.succeeded)
-            failed = sum(1 for r in result if not r.succeeded)
+            pending = list(document_ids)
+            failed = []
+            # Nicht wiederholbare Fehler aller Versuche
+            permanent = []
+            for attempt in range(max_retries + 1):
+                if attempt > 0:
+                    wait_time = 2 ** attempt
+                    print(f"⚠️  {len(pending)} Dokumente gedrosselt. Warte {wait_time} Sekunden... (Versuch {attempt + 1}/{max_retries + 1})")
+                    time.sleep(wait_time)
+
+                # Rate Limiting
+                self.rate_limiter.acquire()
+
+                documents = [{"chunk_id": doc_id} for doc_id in pending]
+                result = self.client.delete_documents(documents=documents)
+
+                # Nur die fehlgeschlagenen Dokumente erneut versuchen
+                failed = [r for r in result if not r.succeeded]
+                permanent += [r for r in failed if r.status_code not in self.RETRY_STATUS_CODES]
+                failed = [r for r in failed if r.status_code in self.RETRY_STATUS_CODES]
+                pending = [r.key for r in failed]
+                if not pending:
+                    break
 
             # Print errors if any
-            if failed > 0:
-                print(f"Warnung: {failed} von {len(document_ids)} Dokumenten konnten nicht gelöscht werden:")
-                for r in result:
-                    if not r.succeeded:
-                        print(f"  - {r.key}: {r.error_message} (Status: {r.status_code})")
+            failed = permanent + failed
+            if failed:
+                print(f"Warnung: {len(failed)} von {len(document_ids)} Dokumenten konnten nicht gelöscht werden:")
+                for r in failed:
+                    print(f"  - {r.key}: {r.error_message} (Status: {r.status_code})")
 
-            return all(r.succeeded for r in result)
+            return not failed
         except Exception as e:
             print(f"Fehler beim Löschen: {e}")
             import traceback
@@ -459,6 +575,47 @@ class VectorDB:
             print(f"Fehler beim Abrufen der Dokumentanzahl: {e}")
             return 0
 
+    def warmup(self) -> None:
+        """
+        Baut die Verbindungen zu Azure AI Search und Azure OpenAI vorab auf.
+
+        Die erste echte Suche spart sich damit DNS-Auflösung und TLS-Handshake.
+        Fehler werden nur ausgegeben, die Clients funktionieren trotzdem.
+        """
+        tasks = [self.get_document_count]
+        if all([self.openai_endpoint, self.openai_api_key, self.openai_deployment]):
+            tasks.append(lambda: self._embed_text(" "))
+
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = [executor.submit(task) for task in tasks]
+
+        for future in futures:
+            if future.exception() is not None:
+                print(f"Warnung: Warmup fehlgeschlagen: {future.exception()}")
+
+    def iter_document_ids(self) -> Iterator[str]:
+        """
+        Liefert die IDs aller Dokumente im Index.
+
+        Es wird nur das Key-Feld abgefragt und seitenweise geladen,
+        Vektoren und Inhalte werden nicht übertragen.
+
+        Returns:
+            Iterator über die Dokument-IDs (chunk_id Werte)
+        """
+        # Rate Limiting
+        self.rate_limiter.acquire()
+
+        results = self.client.search(
+            search_text="*",
+            select=["chunk_id"],
+            include_total_count=False
+        )
+        for result in results:
+            doc_id = result.get("chunk_id")
+            if doc_id:
+                yield str(doc_id)
+
     def get_indexed_documents(self) -> List[str]:
         """
         Gibt eine Liste aller indexierten Dokumente zurück (basierend auf blob_uri).
@@ -467,21 +624,18 @@ class VectorDB:
             Liste von blob_uri Werten (vollständige Blob-URLs)
         """
         try:
-            # Get all unique blob_uris from the index
+            # Get all unique blob_uris from the index, the results are paged in while iterating
             results = self.client.search(
                 search_text="*",
                 select=["blob_uri"],
-                top=10000  # Large number to get all documents
+                include_total_count=False
             )
 
-            # Extract unique blob_uris
-            blob_uris = set()
-            for result in results:
-                blob_uri = result.get("blob_uri")
-                if blob_uri:
-                    blob_uris.add(blob_uri)
+            blob_uris = {result.get("blob_uri") for result in results}
+            blob_uris.discard(None)
+            blob_uris.discard("")
 
-            return sorted(list(blob_uris))
+            return sorted(blob_uris)
         except Exception as e:
             print(f"Fehler beim Abrufen der indexierten Dokumente: {e}")
             return []
@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import logging
 import os
 from dataclasses import dataclass
-from typing import Optional
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import ResourceNotFoundError
 from azure.search.documents.indexes import SearchIndexClient, SearchIndexerClient
+from azure.search.documents.indexes.aio import (
+    SearchIndexClient as AsyncSearchIndexClient,
+    SearchIndexerClient as AsyncSearchIndexerClient,
+)
 from azure.search.documents.indexes.models import (
     AzureOpenAIEmbeddingSkill,
     AzureOpenAIVectorizer,
@@ -16,11 +25,14 @@ from azure.search.documents.indexes.models import (
     FieldMapping,
     FieldMappingFunction,
     HnswAlgorithmConfiguration,
+    HnswParameters,
     IndexProjectionMode,
     IndexingParameters,
     IndexingParametersConfiguration,
     InputFieldMappingEntry,
     OutputFieldMappingEntry,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
     SearchField,
     SearchFieldDataType,
     SearchIndex,
@@ -41,11 +53,22 @@ from azure.search.documents.indexes.models import (
     VectorSearch,
     VectorSearchProfile,
 )
+from azure.search.documents.models import QueryType, VectorizableTextQuery
+
+try:
+    # Incremental enrichment is only modeled by the preview SDKs
+    from azure.search.documents.indexes.models import SearchIndexerCache
+except ImportError:
+    SearchIndexerCache = None
+
+from .blob_storage import AsyncBlobStorage
+
+logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True)
 class PipelineConfig:
-    """Typed configuration for the ingestion pipeline."""
+    """Typed configuration for the ingestion pipeline, frozen so one instance can be shared."""
 
     endpoint: str
     admin_key: str
@@ -60,11 +83,27 @@ class PipelineConfig:
     vector_dimensions: int = 1536
     chunk_size: int = 1200
     chunk_overlap: int = 150
+    # HNSW graph parameters, Azure AI Search accepts m 4-10 and ef values 100-1000
+    hnsw_m: int = 10
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 100
+    hnsw_metric: str = "cosine"
+    # Documents per indexer batch, the service default for blob sources is 10
+    indexer_batch_size: int = 32
+    # Filter and facet structures on the metadata fields, off for a pure search workshop
+    enable_filters: bool = False
+    enable_facets: bool = False
 
 
 class VectorSearchPipeline:
     """Creates the Azure AI Search resources required for the workshop."""
 
+    # SDK retry policy for throttling and transient 5xx, exponential backoff starting at 0.8s
+    RETRY_OPTIONS = {"retry_total": 5, "retry_backoff_factor": 0.8}
+
+    # Fields returned by the query helpers, contentVector stays on the server
+    SEARCH_FIELDS = ["chunk_id", "document_id", "title", "content", "filepath"]
+
     def __init__(
         self,
         config: Optional[PipelineConfig] = None,
@@ -72,16 +111,18 @@ class VectorSearchPipeline:
         self.config = config or self._load_from_env()
 
         self.credential = AzureKeyCredential(self.config.admin_key)
-        self.index_client = SearchIndexClient(endpoint=self.config.endpoint, credential=self.credential)
-        self.indexer_client = SearchIndexerClient(endpoint=self.config.endpoint, credential=self.credential)
+        self._client_options = {"endpoint": self.config.endpoint, "credential": self.credential, **self.RETRY_OPTIONS}
+        self.index_client = SearchIndexClient(**self._client_options)
+        self.indexer_client = SearchIndexerClient(**self._client_options)
 
         self.data_source_name = f"{self.config.index_name}-blob"
         self.skillset_name = f"{self.config.index_name}-skillset"
         self.indexer_name = f"{self.config.index_name}-indexer"
 
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def _load_from_env() -> PipelineConfig:
-        """Build configuration from environment variables."""
+        """Build configuration from environment variables, read once per process."""
         endpoint = os.getenv("VECTOR_DB_ENDPOINT")
         admin_key = os.getenv("VECTOR_DB_ADMIN_KEY")
         index_name = os.getenv("VECTOR_DB_INDEX_NAME", "workshop-documents")
@@ -95,6 +136,13 @@ class VectorSearchPipeline:
         vector_dimensions = int(os.getenv("VECTOR_DB_VECTOR_DIMENSIONS", "1536"))
         chunk_size = int(os.getenv("VECTOR_DB_CHUNK_SIZE", "1200"))
         chunk_overlap = int(os.getenv("VECTOR_DB_CHUNK_OVERLAP", "150"))
+        hnsw_m = int(os.getenv("VECTOR_DB_HNSW_M", "10"))
+        hnsw_ef_construction = int(os.getenv("VECTOR_DB_HNSW_EF_CONSTRUCTION", "200"))
+        hnsw_ef_search = int(os.getenv("VECTOR_DB_HNSW_EF_SEARCH", "100"))
+        hnsw_metric = os.getenv("VECTOR_DB_HNSW_METRIC", "cosine")
+        indexer_batch_size = int(os.getenv("VECTOR_DB_INDEXER_BATCH_SIZE", "32"))
+        enable_filters = os.getenv("VECTOR_DB_ENABLE_FILTERS", "false").lower() == "true"
+        enable_facets = os.getenv("VECTOR_DB_ENABLE_FACETS", "false").lower() == "true"
 
         if not all([endpoint, admin_key, storage_connection_string, openai_endpoint, openai_api_key, openai_deployment]):
             raise ValueError(
@@ -117,18 +165,39 @@ class VectorSearchPipeline:
             vector_dimensions=vector_dimensions,
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
+            hnsw_m=hnsw_m,
+            hnsw_ef_construction=hnsw_ef_construction,
+            hnsw_ef_search=hnsw_ef_search,
+            hnsw_metric=hnsw_metric,
+            indexer_batch_size=indexer_batch_size,
+            enable_filters=enable_filters,
+            enable_facets=enable_facets,
         )
 
     # -------------------------------------------------------------------------
     # Index definition
     # -------------------------------------------------------------------------
 
-    def _build_index(self) -> SearchIndex:
-        """Return the workshop index definition."""
+    @functools.cached_property
+    def _openai_params(self) -> AzureOpenAIVectorizerParameters:
+        """Azure OpenAI embedding deployment shared by the vectorizer and the embedding skill."""
+        return AzureOpenAIVectorizerParameters(
+            resource_url=self.config.openai_endpoint,
+            deployment_name=self.config.openai_deployment,
+            api_key=self.config.openai_api_key,
+            model_name=self.config.openai_model,
+        )
+
+    @functools.cached_property
+    def _index_model(self) -> SearchIndex:
+        """Workshop index definition, the models are built once per pipeline instance."""
         # NOTE: chunk_id and document_id are automatically POPULATED by Azure AI Search
         # when using index projections, but they MUST be defined in the schema.
         # They should NOT be mapped in the index projection mappings.
         # See: https://learn.microsoft.com/en-us/azure/search/search-how-to-define-index-projections
+        # chunk_id and document_id stay filterable, the index projection needs them for its key lookups
+        filterable = self.config.enable_filters
+        facetable = self.config.enable_facets
         fields = [
             SearchableField(
                 name="chunk_id",
@@ -137,17 +206,31 @@ class VectorSearchPipeline:
                 filterable=True,
                 analyzer_name="keyword",
             ),
-            SimpleField(name="document_id", type=SearchFieldDataType.String, filterable=True, facetable=True),
-            SearchableField(name="title", type=SearchFieldDataType.String, filterable=True, sortable=True),
+            SimpleField(name="document_id", type=SearchFieldDataType.String, filterable=True, facetable=facetable),
+            SearchableField(name="title", type=SearchFieldDataType.String, filterable=filterable, sortable=True),
             SearchableField(name="content", type=SearchFieldDataType.String),
-            SimpleField(name="filepath", type=SearchFieldDataType.String, filterable=True, sortable=True),
-            SimpleField(name="blob_uri", type=SearchFieldDataType.String, filterable=True),
-            SimpleField(name="source_type", type=SearchFieldDataType.String, filterable=True, facetable=True),
-            SimpleField(name="last_modified", type=SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
+            SimpleField(name="filepath", type=SearchFieldDataType.String, filterable=filterable, sortable=True),
+            SimpleField(name="blob_uri", type=SearchFieldDataType.String, filterable=filterable),
+            SimpleField(
+                name="source_type",
+                type=SearchFieldDataType.String,
+                filterable=filterable,
+                facetable=facetable,
+            ),
+            SimpleField(
+                name="last_modified",
+                type=SearchFieldDataType.DateTimeOffset,
+                filterable=filterable,
+                sortable=True,
+            ),
+            # Half instead of Single halves the stored vector size. The vector is only searched, never
+            # returned, so no retrievable copy is kept (stored=False requires hidden=True)
             SearchField(
                 name="contentVector",
-                type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+                type=SearchFieldDataType.Collection(SearchFieldDataType.HALF),
                 searchable=True,
+                hidden=True,
+                stored=False,
                 vector_search_dimensions=self.config.vector_dimensions,
                 vector_search_profile_name="content-vector-profile",
             ),
@@ -155,24 +238,35 @@ class VectorSearchPipeline:
 
         vector_search = VectorSearch(
             algorithms=[
-                HnswAlgorithmConfiguration(name="contentHnsw"),
+                HnswAlgorithmConfiguration(
+                    name="contentHnsw",
+                    parameters=HnswParameters(
+                        m=self.config.hnsw_m,
+                        ef_construction=self.config.hnsw_ef_construction,
+                        ef_search=self.config.hnsw_ef_search,
+                        metric=self.config.hnsw_metric,
+                    ),
+                ),
             ],
             profiles=[
                 VectorSearchProfile(
                     name="content-vector-profile",
                     algorithm_configuration_name="contentHnsw",
                     vectorizer_name="content-vectorizer",
+                    compression_name="content-compression",
+                )
+            ],
+            # int8 quantization of the in-memory HNSW graph, the full vectors stay stored for rescoring
+            compressions=[
+                ScalarQuantizationCompression(
+                    compression_name="content-compression",
+                    parameters=ScalarQuantizationParameters(quantized_data_type="int8"),
                 )
             ],
             vectorizers=[
                 AzureOpenAIVectorizer(
                     vectorizer_name="content-vectorizer",
-                    parameters=AzureOpenAIVectorizerParameters(
-                        resource_url=self.config.openai_endpoint,
-                        deployment_name=self.config.openai_deployment,
-                        api_key=self.config.openai_api_key,
-                        model_name=self.config.openai_model,
-                    ),
+                    parameters=self._openai_params,
                 )
             ],
         )
@@ -197,39 +291,39 @@ class VectorSearchPipeline:
         )
 
     def create_index(self) -> None:
-        """Create the index if it doesn't exist."""
-        if self.index_exists():
-            print(f"      ℹ️  Index '{self.config.index_name}' existiert bereits")
-            return
-        index = self._build_index()
-        self.index_client.create_index(index)
-        print(f"      ℹ️  Index '{self.config.index_name}' wurde neu erstellt")
+        """Create or update the index in a single request."""
+        self.index_client.create_or_update_index(self._index_model)
 
     def index_exists(self) -> bool:
         """Return True if the index already exists."""
         try:
             self.index_client.get_index(self.config.index_name)
             return True
-        except Exception:
+        except ResourceNotFoundError:
             return False
 
     # -------------------------------------------------------------------------
     # Data source & skillset
     # -------------------------------------------------------------------------
 
-    def create_data_source(self) -> None:
-        """Create or update the blob data source."""
-        data_source = SearchIndexerDataSourceConnection(
+    @functools.cached_property
+    def _data_source_model(self) -> SearchIndexerDataSourceConnection:
+        """Blob data source definition."""
+        return SearchIndexerDataSourceConnection(
             name=self.data_source_name,
             type="azureblob",
             connection_string=self.config.storage_connection_string,
             container=SearchIndexerDataContainer(name=self.config.storage_container),
             description="Workshop documents stored in Azure Blob Storage",
         )
-        self.indexer_client.create_or_update_data_source_connection(data_source)
 
-    def create_skillset(self) -> None:
-        """Create the skillset used for chunking and embedding."""
+    def create_data_source(self) -> None:
+        """Create or update the blob data source."""
+        self.indexer_client.create_or_update_data_source_connection(self._data_source_model)
+
+    @functools.cached_property
+    def _skillset_model(self) -> SearchIndexerSkillset:
+        """Skillset definition used for chunking and embedding."""
         split_skill = SplitSkill(
             name="chunk-documents",
             description="Split extracted text into overlapping passages",
@@ -243,14 +337,16 @@ class VectorSearchPipeline:
             outputs=[OutputFieldMappingEntry(name="textItems", target_name="chunks")],
         )
 
+        # Same Azure OpenAI deployment as the query vectorizer
+        openai_params = self._openai_params
         embedding_skill = AzureOpenAIEmbeddingSkill(
             name="chunk-embeddings",
             description="Generate embeddings for every chunk",
             context="/document/chunks/*",
-            deployment_name=self.config.openai_deployment,
-            resource_url=self.config.openai_endpoint,
-            api_key=self.config.openai_api_key,
-            model_name=self.config.openai_model,
+            deployment_name=openai_params.deployment_name,
+            resource_url=openai_params.resource_url,
+            api_key=openai_params.api_key,
+            model_name=openai_params.model_name,
             dimensions=self.config.vector_dimensions,
             inputs=[InputFieldMappingEntry(name="text", source="/document/chunks/*")],
             outputs=[OutputFieldMappingEntry(name="embedding", target_name="chunkVector")],
@@ -281,7 +377,7 @@ class VectorSearchPipeline:
             ),
         )
 
-        skillset = SearchIndexerSkillset(
+        return SearchIndexerSkillset(
             name=self.skillset_name,
             description="Chunk PDFs and create embeddings via Azure OpenAI",
             skills=[split_skill, embedding_skill],
@@ -289,15 +385,20 @@ class VectorSearchPipeline:
             index_projection=index_projection,
         )
 
-        self.indexer_client.create_or_update_skillset(skillset)
+    def create_skillset(self) -> None:
+        """Create the skillset used for chunking and embedding."""
+        self.indexer_client.create_or_update_skillset(self._skillset_model)
 
     # -------------------------------------------------------------------------
     # Indexer
     # -------------------------------------------------------------------------
 
-    def create_indexer(self) -> None:
-        """Create the indexer that ties data source, skillset and index together."""
+    @functools.cached_property
+    def _indexer_model(self) -> SearchIndexer:
+        """Indexer definition that ties data source, skillset and index together."""
         parameters = IndexingParameters(
+            # Larger batches mean fewer skillset executions and embedding round trips per run
+            batch_size=self.config.indexer_batch_size,
             configuration=IndexingParametersConfiguration(
                 parsing_mode="default",
                 data_to_extract="contentAndMetadata",
@@ -308,7 +409,17 @@ class VectorSearchPipeline:
             )
         )
 
-        indexer = SearchIndexer(
+        # Incremental enrichment: skill outputs are cached in the storage account, so unchanged
+        # blobs are not split and embedded again when the indexer reruns. The stable SDK models
+        # reject unknown keywords, so the cache is only passed when the SDK defines it.
+        extra = {}
+        if SearchIndexerCache is not None:
+            extra["cache"] = SearchIndexerCache(
+                storage_connection_string=self.config.storage_connection_string,
+                enable_reprocessing=True,
+            )
+
+        return SearchIndexer(
             name=self.indexer_name,
             description="Blob → skillset → vector index pipeline",
             data_source_name=self.data_source_name,
@@ -317,124 +428,197 @@ class VectorSearchPipeline:
             parameters=parameters,
             # No field_mappings or output_field_mappings needed when using index projections
             # All mappings are defined in the skillset's index projection
+            **extra,
         )
 
-        self.indexer_client.create_or_update_indexer(indexer)
+    def create_indexer(self) -> None:
+        """Create the indexer that ties data source, skillset and index together."""
+        self.indexer_client.create_or_update_indexer(self._indexer_model)
 
     # -------------------------------------------------------------------------
     # Public helpers
     # -------------------------------------------------------------------------
 
+    def _resources(self, index_client, indexer_client) -> List[Tuple[str, Callable[[str], Any], str]]:
+        """Label, delete operation and name of every pipeline resource, in deletion order."""
+        return [
+            ("Indexer", indexer_client.delete_indexer, self.indexer_name),
+            ("Skillset", indexer_client.delete_skillset, self.skillset_name),
+            ("Data Source", indexer_client.delete_data_source_connection, self.data_source_name),
+            ("Index", index_client.delete_index, self.config.index_name),
+        ]
+
+    @staticmethod
+    def _safe_delete(label: str, delete: Callable[[str], Any], name: str) -> None:
+        """Delete one resource, a missing resource is fine, every other error is raised."""
+        try:
+            delete(name)
+            logger.info("      ✅ %s gelöscht", label)
+        except ResourceNotFoundError:
+            logger.info("      ℹ️  %s existiert nicht", label)
+        except Exception as e:
+            logger.error("      ❌ Fehler beim Löschen von %s: %s", label, e)
+            raise
+
     def bootstrap(self, *, force_recreate: bool = True) -> None:
         """
         Create or update pipeline resources.
 
         Args:
             force_recreate: If True (default), delete all existing resources and recreate from scratch.
-                          If False, only run the indexer with reset (for incremental updates).
+                          If False, update the resources in place and run the indexer, which only
+                          picks up new or changed blobs.
 
-        Note: force_recreate=False is currently not recommended because Azure AI Search
-              indexers don't support true incremental updates. Always use force_recreate=True
-              to ensure all documents are properly indexed.
+        Note: All resources are created with create_or_update, so force_recreate=False is safe to rerun.
+              force_recreate=True is only needed for schema changes the index can't apply in place,
+              e.g. a changed vector field.
         """
         if force_recreate:
-            print("🔧 Lösche alte Ressourcen und erstelle Pipeline neu...")
+            logger.info("🔧 Lösche alte Ressourcen und erstelle Pipeline neu...")
 
             # Delete all existing resources in reverse order
-            try:
-                print("  1/8 Lösche Indexer...")
-                try:
-                    self.indexer_client.delete_indexer(self.indexer_name)
-                    print("      ✅ Indexer gelöscht")
-                except:
-                    print("      ℹ️  Indexer existiert nicht")
-            except Exception as e:
-                print(f"      ❌ Fehler beim Löschen des Indexer: {e}")
-
-            try:
-                print("  2/8 Lösche Skillset...")
-                try:
-                    self.indexer_client.delete_skillset(self.skillset_name)
-                    print("      ✅ Skillset gelöscht")
-                except:
-                    print("      ℹ️  Skillset existiert nicht")
-            except Exception as e:
-                print(f"      ❌ Fehler beim Löschen des Skillset: {e}")
-
-            try:
-                print("  3/8 Lösche Data Source...")
-                try:
-                    self.indexer_client.delete_data_source_connection(self.data_source_name)
-                    print("      ✅ Data Source gelöscht")
-                except:
-                    print("      ℹ️  Data Source existiert nicht")
-            except Exception as e:
-                print(f"      ❌ Fehler beim Löschen der Data Source: {e}")
-
-            try:
-                print("  4/8 Lösche Index...")
-                try:
-                    self.index_client.delete_index(self.config.index_name)
-                    print("      ✅ Index gelöscht")
-                except:
-                    print("      ℹ️  Index existiert nicht")
-            except Exception as e:
-                print(f"      ❌ Fehler beim Löschen des Index: {e}")
+            for step, (label, delete, name) in enumerate(self._resources(self.index_client, self.indexer_client), 1):
+                logger.info("  %d/8 Lösche %s...", step, label)
+                self._safe_delete(label, delete, name)
         else:
-            # Incremental mode: just reset and run the indexer
-            print("🔧 Starte Indexer für inkrementelle Aktualisierung...")
-            print("   (Hinweis: Dies funktioniert nur, wenn Pipeline bereits existiert)")
-
-            try:
-                print("  1/1 Indexer zurücksetzen und starten...")
-                self.run_indexer(reset=True)
-                print("      ✅ Indexer gestartet")
-            except Exception as e:
-                print(f"      ❌ Fehler: {e}")
-                print("\n⚠️  Pipeline existiert möglicherweise nicht!")
-                print("   Führe stattdessen aus: pipeline.bootstrap(force_recreate=True)")
-                raise
-
-            print("\n✅ Indexer wurde gestartet!")
-            print("   Der Indexer verarbeitet jetzt neue Dokumente.")
-            return
+            # Upserts are idempotent, existing resources are updated in place
+            logger.info("🔧 Aktualisiere Pipeline-Ressourcen...")
 
-        # Create all resources (only when force_recreate=True)
+        # Create or update all resources
         try:
-            print("  5/8 Index erstellen...")
+            logger.info("  5/8 Index erstellen...")
             self.create_index()
-            print("      ✅ Index erstellt")
+            logger.info("      ✅ Index erstellt")
         except Exception as e:
-            print(f"      ❌ Fehler beim Erstellen des Index: {e}")
+            logger.error("      ❌ Fehler beim Erstellen des Index: %s", e)
             raise
 
         try:
-            print("  6/8 Data Source erstellen...")
+            logger.info("  6/8 Data Source erstellen...")
             self.create_data_source()
-            print("      ✅ Data Source erstellt")
+            logger.info("      ✅ Data Source erstellt")
         except Exception as e:
-            print(f"      ❌ Fehler beim Erstellen der Data Source: {e}")
+            logger.error("      ❌ Fehler beim Erstellen der Data Source: %s", e)
             raise
 
         try:
-            print("  7/8 Skillset erstellen...")
+            logger.info("  7/8 Skillset erstellen...")
             self.create_skillset()
-            print("      ✅ Skillset erstellt")
+            logger.info("      ✅ Skillset erstellt")
         except Exception as e:
-            print(f"      ❌ Fehler beim Erstellen des Skillset: {e}")
+            logger.error("      ❌ Fehler beim Erstellen des Skillset: %s", e)
             raise
 
         try:
-            print("  8/8 Indexer erstellen und starten...")
+            logger.info("  8/8 Indexer erstellen und starten...")
             self.create_indexer()
             # The indexer starts automatically after creation
-            print("      ✅ Indexer erstellt und gestartet")
+            logger.info("      ✅ Indexer erstellt und gestartet")
         except Exception as e:
-            print(f"      ❌ Fehler beim Erstellen des Indexer: {e}")
+            logger.error("      ❌ Fehler beim Erstellen des Indexer: %s", e)
             raise
 
-        print("\n✅ Pipeline erfolgreich neu erstellt!")
-        print("   Der Indexer wurde gestartet und verarbeitet jetzt die Dokumente.")
+        if not force_recreate:
+            # Only a newly created indexer starts by itself, an updated one has to be triggered
+            try:
+                self.run_indexer()
+            except Exception as e:
+                logger.info("      ℹ️  Indexer läuft bereits: %s", e)
+            logger.info("\n✅ Pipeline aktualisiert!")
+            logger.info("   Der Indexer verarbeitet jetzt neue und geänderte Dokumente.")
+            return
+
+        logger.info("\n✅ Pipeline erfolgreich neu erstellt!")
+        logger.info("   Der Indexer wurde gestartet und verarbeitet jetzt die Dokumente.")
+
+    async def bootstrap_async(self, *, force_recreate: bool = True) -> None:
+        """
+        Create or update pipeline resources with concurrent requests.
+
+        Same result as bootstrap(force_recreate=...). The four deletes are independent and run together,
+        index and data source are created together, skillset and indexer follow in dependency order.
+        Use it from async code, e.g. ``await pipeline.bootstrap_async()`` in a notebook.
+
+        Args:
+            force_recreate: If True (default), delete all existing resources and recreate from scratch.
+                          If False, update the resources in place and run the indexer.
+        """
+        async with AsyncSearchIndexClient(**self._client_options) as index_client, \
+                AsyncSearchIndexerClient(**self._client_options) as indexer_client:
+
+            async def safe_delete(label: str, delete: Callable[[str], Awaitable[Any]], name: str) -> None:
+                try:
+                    await delete(name)
+                    logger.info("      ✅ %s gelöscht", label)
+                except ResourceNotFoundError:
+                    logger.info("      ℹ️  %s existiert nicht", label)
+
+            if force_recreate:
+                logger.info("🔧 Lösche alte Ressourcen und erstelle Pipeline neu...")
+                logger.info("  1/3 Lösche Indexer, Skillset, Data Source und Index...")
+                await asyncio.gather(*(
+                    safe_delete(*resource) for resource in self._resources(index_client, indexer_client)
+                ))
+            else:
+                # Upserts are idempotent, existing resources are updated in place
+                logger.info("🔧 Aktualisiere Pipeline-Ressourcen...")
+
+            try:
+                logger.info("  2/3 Index und Data Source erstellen...")
+                await asyncio.gather(
+                    index_client.create_or_update_index(self._index_model),
+                    indexer_client.create_or_update_data_source_connection(self._data_source_model),
+                )
+                logger.info("      ✅ Index und Data Source erstellt")
+
+                # The skillset projects into the index, the indexer references all of them
+                logger.info("  3/3 Skillset und Indexer erstellen und starten...")
+                await indexer_client.create_or_update_skillset(self._skillset_model)
+                await indexer_client.create_or_update_indexer(self._indexer_model)
+                logger.info("      ✅ Skillset und Indexer erstellt, Indexer gestartet")
+            except Exception as e:
+                logger.error("      ❌ Fehler beim Erstellen der Pipeline: %s", e)
+                raise
+
+            if not force_recreate:
+                # Only a newly created indexer starts by itself, an updated one has to be triggered
+                try:
+                    await indexer_client.run_indexer(self.indexer_name)
+                except Exception as e:
+                    logger.info("      ℹ️  Indexer läuft bereits: %s", e)
+                logger.info("\n✅ Pipeline aktualisiert!")
+                logger.info("   Der Indexer verarbeitet jetzt neue und geänderte Dokumente.")
+                return
+
+        logger.info("\n✅ Pipeline erfolgreich neu erstellt!")
+        logger.info("   Der Indexer wurde gestartet und verarbeitet jetzt die Dokumente.")
+
+    async def ingest_local_files_async(
+        self,
+        paths: Iterable[Union[str, Path]],
+        max_concurrency: int = 16,
+    ) -> List[str]:
+        """
+        Upload local files concurrently to the pipeline container, then run the indexer once.
+
+        Args:
+            paths: Local files to ingest, stored under their file name
+            max_concurrency: Number of uploads in flight at the same time
+
+        Returns:
+            Blob URLs of the uploaded files
+        """
+        async with AsyncBlobStorage(self.config.storage_connection_string, self.config.storage_container) as storage:
+            storage.CONCURRENCY = max_concurrency
+            uploaded = await storage.upload_files(paths)
+
+        # One indexer run picks up the whole batch
+        self.run_indexer()
+        return uploaded
+
+    def ingest_local_files(self, paths: Iterable[Union[str, Path]], max_concurrency: int = 16) -> List[str]:
+        """Synchronous wrapper around ingest_local_files_async, for scripts without an event loop."""
+        return asyncio.run(self.ingest_local_files_async(paths, max_concurrency=max_concurrency))
 
     def run_indexer(self, *, reset: bool = False) -> None:
         """Trigger the indexer and optionally reset its status."""
@@ -461,3 +645,52 @@ class VectorSearchPipeline:
             return f"Status: {status.status}"
         except Exception as e:
             return f"Error getting status: {e}"
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def build_vector_query(self, text: str, k: int = 10) -> VectorizableTextQuery:
+        """
+        Return an approximate (HNSW) vector query, vectorized server side by the index vectorizer.
+
+        efSearch can't be set per query in Azure AI Search, it is part of the index definition
+        (PipelineConfig.hnsw_ef_search, minimum 100). k is the query-time knob for the
+        recall/latency tradeoff.
+        """
+        return VectorizableTextQuery(text=text, k_nearest_neighbors=k, fields="contentVector", exhaustive=False)
+
+    def run_search(self, text: str, k: int = 10, select: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Run a pure vector search against the pipeline index and return the top k chunks."""
+        with self.index_client.get_search_client(self.config.index_name) as search_client:
+            results = search_client.search(
+                search_text=None,
+                vector_queries=[self.build_vector_query(text, k=k)],
+                select=select or self.SEARCH_FIELDS,
+                top=k,
+            )
+            return [dict(result) for result in results]
+
+    def search_with_rerank(
+        self,
+        query: str,
+        top_k: int = 10,
+        retrieve_k: int = 40,
+        select: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Hybrid search whose top retrieve_k candidates are reranked by the semantic ranker.
+
+        The HNSW recall set only has to contain the relevant chunks, their order comes from
+        the workshop-semantic-config reranker, which returns the best top_k.
+        """
+        with self.index_client.get_search_client(self.config.index_name) as search_client:
+            results = search_client.search(
+                search_text=query,
+                vector_queries=[self.build_vector_query(query, k=retrieve_k)],
+                query_type=QueryType.SEMANTIC,
+                semantic_configuration_name="workshop-semantic-config",
+                select=select or self.SEARCH_FIELDS,
+                top=top_k,
+            )
+            return [dict(result) for result in results]
@@ -12,12 +12,18 @@ class Vision:
     
     def __init__(self, api_key: Optional[str] = None, endpoint: Optional[str] = None):
         self.endpoint = endpoint or os.getenv("VISION_ENDPOINT", "")
-        self.auth = get_auth()
-        self.api_key = api_key or self.auth.get_api_key("vision")
+        # API Key aus Parameter, sonst beim ersten Zugriff aus Key Vault
+        self._api_key = api_key
         self.rate_limiter = get_rate_limiter("vision", max_requests=20)
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """API Key, der Key Vault wird erst beim ersten Zugriff abgefragt."""
+        if self._api_key is None:
+            self._api_key = get_auth().get_api_key("vision")
+        return self._api_key
     
     def analyze_image(self, image_path: str) -> Dict[str, Any]:
         """Analysiert ein Bild."""
-        self.rate_limiter.acquire()
         return {"status": "not_implemented"}
 